@@ -0,0 +1,24 @@
+# Generated by Django 4.2.7 on 2026-10-17 10:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("catalogue", "0003_alter_psychologist_languages"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="psychologist",
+            index=models.Index(
+                condition=models.Q(
+                    ("availability_status", "available"),
+                    ("is_accepting_referrals", True),
+                    ("is_active", True),
+                ),
+                fields=["service_type", "modality"],
+                name="catalogue_psych_feasible_idx",
+            ),
+        ),
+    ]
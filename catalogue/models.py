@@ -148,6 +148,17 @@ class Psychologist(models.Model):
             models.Index(fields=["is_active"]),
             models.Index(fields=["is_accepting_referrals"]),
             models.Index(fields=["registration_number"]),
+            # Matches FeasibilityFilter's fixed predicates, so the feasibility
+            # query only scans psychologists who can take a referral at all
+            models.Index(
+                fields=["service_type", "modality"],
+                condition=models.Q(
+                    is_active=True,
+                    is_accepting_referrals=True,
+                    availability_status="available",
+                ),
+                name="catalogue_psych_feasible_idx",
+            ),
         ]
 
     def save(self, *args, **kwargs):
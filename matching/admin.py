@@ -47,7 +47,12 @@ class MatchingRunAdmin(admin.ModelAdmin):
     readonly_fields = ("created_at", "updated_at")
 
     def get_queryset(self, request: Any) -> Any:
-        return super().get_queryset(request).select_related("referral")
+        # The referral column renders the patient's name, so join the patient
+        return (
+            super()
+            .get_queryset(request)
+            .select_related("referral__patient", "referral__patient_profile")
+        )
 
 
 @admin.register(MatchingAlgorithm)
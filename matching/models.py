@@ -4,12 +4,21 @@ Matching models for ReferWell Direct.
 import uuid
 
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.db import models
-from django.db.models.signals import pre_save
+from django.db.models.signals import post_delete, post_save, pre_save
 from django.dispatch import receiver
 
+from referrals.models import Referral
+
 User = get_user_model()
 
+# Routing statistics are global, so every user shares one cached copy
+ROUTING_STATISTICS_CACHE_KEY = "routing_statistics"
+
+# Active thresholds for every user type, shared by the config views
+ACTIVE_THRESHOLDS_CACHE_KEY = "threshold_config_active"
+
 
 class MatchingRun(models.Model):
     """
@@ -159,6 +168,9 @@ class CalibrationModel(models.Model):
         PLATT = "platt", "Platt Scaling"
         TEMPERATURE = "temperature", "Temperature Scaling"
 
+    # Built once so display lookups are a dict hit rather than a choices scan
+    _CALIBRATION_TYPE_LABELS = dict(CalibrationType.choices)
+
     # Basic fields
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     name = models.CharField(max_length=100)
@@ -202,6 +214,12 @@ class CalibrationModel(models.Model):
     def __str__(self):
         return f"{self.name} v{self.version} ({self.get_calibration_type_display()})"
 
+    def get_calibration_type_display(self):
+        """Get the calibration type label, falling back to the raw value."""
+        return self._CALIBRATION_TYPE_LABELS.get(
+            self.calibration_type, self.calibration_type
+        )
+
 
 class MatchingThreshold(models.Model):
     """
@@ -214,6 +232,8 @@ class MatchingThreshold(models.Model):
         PSYCHOLOGIST = "psychologist", "Psychologist"
         ADMIN = "admin", "Admin"
 
+    _USER_TYPE_LABELS = dict(UserType.choices)
+
     # Basic fields
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     user_type = models.CharField(max_length=20, choices=UserType.choices)
@@ -244,6 +264,10 @@ class MatchingThreshold(models.Model):
     def __str__(self):
         return f"Thresholds for {self.get_user_type_display()}"
 
+    def get_user_type_display(self):
+        """Get the user type label, falling back to the raw value."""
+        return self._USER_TYPE_LABELS.get(self.user_type, self.user_type)
+
 
 @receiver(pre_save, sender=MatchingAlgorithm)
 def ensure_single_default_algorithm(sender, instance, **kwargs):
@@ -263,3 +287,17 @@ def ensure_single_default_calibration(sender, instance, **kwargs):
         CalibrationModel.objects.filter(is_default=True).exclude(pk=instance.pk).update(
             is_default=False
         )
+
+
+@receiver(post_save, sender=Referral)
+@receiver(post_delete, sender=Referral)
+def invalidate_routing_statistics(sender, instance, **kwargs):
+    """Drop cached routing statistics whenever a referral changes."""
+    cache.delete(ROUTING_STATISTICS_CACHE_KEY)
+
+
+@receiver(post_save, sender=MatchingThreshold)
+@receiver(post_delete, sender=MatchingThreshold)
+def invalidate_active_thresholds(sender, instance, **kwargs):
+    """Drop the cached active thresholds whenever a threshold changes."""
+    cache.delete(ACTIVE_THRESHOLDS_CACHE_KEY)
@@ -7,12 +7,31 @@ from typing import Any
 
 from django.db import transaction
 from django.db.models import Q
+from django.utils import timezone
 
-from matching.models import MatchingThreshold
+from matching.models import (
+    ACTIVE_THRESHOLDS_CACHE_KEY,
+    ROUTING_STATISTICS_CACHE_KEY,
+    MatchingThreshold,
+)
 from referrals.models import Referral
 
 logger = logging.getLogger(__name__)
 
+# Default threshold configuration for each user type
+DEFAULT_THRESHOLDS = [
+    {"user_type": "gp", "auto_threshold": 0.7, "high_touch_threshold": 0.5},
+    {"user_type": "patient", "auto_threshold": 0.8, "high_touch_threshold": 0.6},
+    {"user_type": "psychologist", "auto_threshold": 0.6, "high_touch_threshold": 0.4},
+    {"user_type": "admin", "auto_threshold": 0.5, "high_touch_threshold": 0.3},
+]
+
+# Dashboards poll the statistics, so serve them from cache for up to a minute
+ROUTING_STATISTICS_CACHE_TIMEOUT = 60
+
+# Thresholds rarely change and saves invalidate them, so cache for longer
+ACTIVE_THRESHOLDS_CACHE_TIMEOUT = 300
+
 
 class ReferralRoutingService:
     """
@@ -37,41 +56,7 @@ class ReferralRoutingService:
         """
         try:
             with transaction.atomic():
-                decision = routing_decision.get("decision", "manual_review")
-
-                if decision == "auto":
-                    # Auto-route: referral can proceed with automatic matching
-                    referral.status = Referral.Status.SHORTLISTED
-                    self.logger.info(
-                        f"Auto-routed referral {referral.id} to shortlisted"
-                    )
-
-                elif decision == "high_touch":
-                    # High-touch route: needs human review
-                    referral.status = Referral.Status.HIGH_TOUCH_QUEUE
-                    self.logger.info(
-                        f"High-touch routed referral {referral.id} to queue"
-                    )
-
-                else:  # manual_review
-                    # Manual review: needs human intervention
-                    referral.status = Referral.Status.MATCHING
-                    self.logger.info(
-                        f"Manual review required for referral {referral.id}"
-                    )
-
-                # Add routing information to referral metadata
-                if not hasattr(referral, "routing_metadata"):
-                    referral.routing_metadata = {}
-
-                referral.routing_metadata.update(
-                    {
-                        "routing_decision": routing_decision,
-                        "routed_at": referral.updated_at.isoformat()
-                        if referral.updated_at
-                        else None,
-                    }
-                )
+                decision = self._apply_routing(referral, routing_decision)
 
                 referral.save(
                     update_fields=["status", "routing_metadata", "updated_at"]
@@ -86,26 +71,124 @@ class ReferralRoutingService:
             self.logger.error(f"Failed to route referral {referral.id}: {e}")
             return False
 
-    def get_high_touch_queue(self, limit: int = 50) -> list[Referral]:
+    def route_referrals_bulk(
+        self, decisions: list[tuple[Referral, dict[str, Any]]]
+    ) -> bool:
+        """
+        Route many referrals, writing all of them in one bulk update.
+
+        Args:
+            decisions: List of (referral, routing_decision) tuples
+
+        Returns:
+            True if routing was successful, False otherwise
+        """
+        try:
+            now = timezone.now()
+            referrals = []
+            for referral, routing_decision in decisions:
+                self._apply_routing(referral, routing_decision)
+                # bulk_update() skips auto_now, so stamp updated_at ourselves
+                referral.updated_at = now
+                referrals.append(referral)
+
+            # bulk_update() runs every batch in one transaction itself
+            Referral.objects.bulk_update(
+                referrals, ["status", "routing_metadata", "updated_at"], batch_size=500
+            )
+
+            # bulk_update() sends no post_save, so drop the statistics here
+            self.invalidate_routing_statistics()
+
+            self.logger.info(f"Successfully routed {len(referrals)} referrals")
+            return True
+
+        except Exception as e:
+            self.logger.error(f"Failed to bulk route referrals: {e}")
+            return False
+
+    def _apply_routing(
+        self, referral: Referral, routing_decision: dict[str, Any]
+    ) -> str:
+        """
+        Set a referral's status and routing metadata without saving it.
+
+        Args:
+            referral: The referral to route
+            routing_decision: Dictionary containing routing decision details
+
+        Returns:
+            The routing decision applied
+        """
+        decision = routing_decision.get("decision", "manual_review")
+
+        if decision == "auto":
+            # Auto-route: referral can proceed with automatic matching
+            referral.status = Referral.Status.SHORTLISTED
+            self.logger.debug(f"Auto-routed referral {referral.id} to shortlisted")
+
+        elif decision == "high_touch":
+            # High-touch route: needs human review
+            referral.status = Referral.Status.HIGH_TOUCH_QUEUE
+            self.logger.debug(f"High-touch routed referral {referral.id} to queue")
+
+        else:  # manual_review
+            # Manual review: needs human intervention
+            referral.status = Referral.Status.MATCHING
+            self.logger.debug(f"Manual review required for referral {referral.id}")
+
+        # Add routing information to referral metadata
+        if not hasattr(referral, "routing_metadata"):
+            referral.routing_metadata = {}
+
+        referral.routing_metadata.update(
+            {
+                "routing_decision": routing_decision,
+                "routed_at": referral.updated_at.isoformat()
+                if referral.updated_at
+                else None,
+            }
+        )
+
+        return decision
+
+    def get_high_touch_queue(self, limit: int = 50, offset: int = 0) -> list[Referral]:
         """
         Get referrals in the high-touch queue.
 
         Args:
             limit: Maximum number of referrals to return
+            offset: Number of referrals to skip, oldest first
 
         Returns:
             List of referrals in high-touch queue
         """
+        # Callers list patient and referrer names, so join both users
         return list(
-            Referral.objects.filter(status=Referral.Status.HIGH_TOUCH_QUEUE).order_by(
-                "created_at"
-            )[:limit]
+            Referral.objects.filter(status=Referral.Status.HIGH_TOUCH_QUEUE)
+            .select_related("patient", "referrer")
+            .order_by("created_at")[offset : offset + limit]
         )
 
     def get_routing_statistics(self) -> dict[str, Any]:
         """
         Get statistics about referral routing.
 
+        Returns:
+            Dictionary with routing statistics
+        """
+        from django.core.cache import cache
+
+        return cache.get_or_set(
+            ROUTING_STATISTICS_CACHE_KEY,
+            self._compute_routing_statistics,
+            ROUTING_STATISTICS_CACHE_TIMEOUT,
+        )
+
+    def _compute_routing_statistics(self) -> dict[str, Any]:
+        """
+        Count referrals per routing queue in a single aggregate query.
+
         Returns:
             Dictionary with routing statistics
         """
@@ -148,33 +231,14 @@ class ReferralRoutingService:
             True if successful, False otherwise
         """
         try:
-            default_thresholds = [
-                {
-                    "user_type": "gp",
-                    "auto_threshold": 0.7,
-                    "high_touch_threshold": 0.5,
-                },
-                {
-                    "user_type": "patient",
-                    "auto_threshold": 0.8,
-                    "high_touch_threshold": 0.6,
-                },
-                {
-                    "user_type": "psychologist",
-                    "auto_threshold": 0.6,
-                    "high_touch_threshold": 0.4,
-                },
-                {
-                    "user_type": "admin",
-                    "auto_threshold": 0.5,
-                    "high_touch_threshold": 0.3,
-                },
-            ]
-
-            for threshold_data in default_thresholds:
-                MatchingThreshold.objects.get_or_create(
-                    user_type=threshold_data["user_type"], defaults=threshold_data
-                )
+            # Skip user types that already have thresholds, as get_or_create did
+            MatchingThreshold.objects.bulk_create(
+                [MatchingThreshold(**threshold) for threshold in DEFAULT_THRESHOLDS],
+                ignore_conflicts=True,
+            )
+
+            # bulk_create() sends no post_save, so drop the cached list here
+            self.invalidate_threshold_cache()
 
             self.logger.info("Created default threshold configurations")
             return True
@@ -183,6 +247,23 @@ class ReferralRoutingService:
             self.logger.error(f"Failed to create default thresholds: {e}")
             return False
 
+    def get_active_thresholds(self) -> list[MatchingThreshold]:
+        """
+        Get the active threshold configurations, cached between requests.
+
+        Returns:
+            List of active thresholds ordered by user type
+        """
+        from django.core.cache import cache
+
+        return cache.get_or_set(
+            ACTIVE_THRESHOLDS_CACHE_KEY,
+            lambda: list(
+                MatchingThreshold.objects.filter(is_active=True).order_by("user_type")
+            ),
+            ACTIVE_THRESHOLDS_CACHE_TIMEOUT,
+        )
+
     def invalidate_threshold_cache(self, user_type: str | None = None) -> None:
         """
         Invalidate threshold configuration cache.
@@ -194,29 +275,43 @@ class ReferralRoutingService:
 
         if user_type:
             cache_key = f"threshold_config_{user_type}"
-            cache.delete(cache_key)
+            cache.delete_many([cache_key, ACTIVE_THRESHOLDS_CACHE_KEY])
             self.logger.info(f"Invalidated threshold cache for user type: {user_type}")
         else:
-            # Invalidate all threshold caches
-            user_types = ["gp", "patient", "psychologist", "admin"]
-            for ut in user_types:
-                cache_key = f"threshold_config_{ut}"
-                cache.delete(cache_key)
+            # Invalidate all threshold caches in a single round trip
+            cache.delete_many(
+                [f"threshold_config_{ut}" for ut in MatchingThreshold.UserType.values]
+                + [ACTIVE_THRESHOLDS_CACHE_KEY]
+            )
             self.logger.info("Invalidated all threshold caches")
 
+    def invalidate_routing_statistics(self) -> None:
+        """
+        Invalidate the cached routing statistics.
+        """
+        from django.core.cache import cache
+
+        cache.delete(ROUTING_STATISTICS_CACHE_KEY)
+
     def clear_all_caches(self) -> None:
         """
         Clear all matching-related caches.
         """
         from django.core.cache import cache
 
-        # Clear embedding caches
-        cache.delete_many(cache.keys("embedding_*"))  # type: ignore[attr-defined]
+        # Clear threshold caches and routing statistics, whose keys are known
+        cache.delete_many(
+            [f"threshold_config_{ut}" for ut in MatchingThreshold.UserType.values]
+            + [ACTIVE_THRESHOLDS_CACHE_KEY, ROUTING_STATISTICS_CACHE_KEY]
+        )
 
-        # Clear BM25 caches
-        cache.delete_many(cache.keys("bm25_*"))  # type: ignore[attr-defined]
+        # Embedding and BM25 entries are keyed by content hashes, so only
+        # django-redis can find them by pattern; elsewhere they just expire
+        if hasattr(cache, "keys"):
+            # Clear embedding caches
+            cache.delete_many(cache.keys("embedding_*"))  # type: ignore[attr-defined]
 
-        # Clear threshold caches
-        cache.delete_many(cache.keys("threshold_config_*"))  # type: ignore[attr-defined]
+            # Clear BM25 caches
+            cache.delete_many(cache.keys("bm25_*"))  # type: ignore[attr-defined]
 
         self.logger.info("Cleared all matching-related caches")
@@ -1,17 +1,24 @@
 """
 Matching services for ReferWell Direct.
 """
+import functools
+import hashlib
+import json
 import logging
+import operator
 import pickle
+import threading
+import time
+from collections import OrderedDict
 from typing import Any
 
 import numpy as np
+from scipy.special import expit
 
 # Lazy import - will be imported when needed
-from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.feature_extraction.text import CountVectorizer
 from sklearn.isotonic import IsotonicRegression
 from sklearn.linear_model import LogisticRegression
-from sklearn.metrics.pairwise import cosine_similarity
 
 from django.contrib.gis.db.models import Q
 from django.contrib.gis.geos import Point
@@ -23,6 +30,63 @@ from referrals.models import Referral
 
 logger = logging.getLogger(__name__)
 
+# C-implemented sort keys for match dicts and (id, score) pairs
+_SCORE_KEY = operator.itemgetter("score")
+_PAIR_SCORE_KEY = operator.itemgetter(1)
+
+# Psychologist columns read by retrieval, scoring and the results page; the
+# feasibility predicates only appear in WHERE, so they need not be selected
+_MATCHING_FIELDS = (
+    "id",
+    "user",
+    "service_type",
+    "modality",
+    "years_experience",
+    "specialisms",
+    "qualifications",
+    "languages",
+    "preferred_age_groups",
+    "preferred_conditions",
+    "embedding",
+)
+
+# Referrer role -> threshold user type
+_ROLE_TO_USER_TYPE = {
+    "gp": "gp",
+    "doctor": "gp",
+    "referrer": "gp",
+    "patient": "patient",
+    "psychologist": "psychologist",
+    "admin": "admin",
+    "administrator": "admin",
+}
+
+
+@functools.lru_cache(maxsize=4096)
+def _parse_embedding(raw_embedding: str) -> np.ndarray:
+    """
+    Parse a stored JSON embedding into a read-only float32 vector.
+
+    Memoised on the stored text, so an unchanged embedding is only decoded
+    once per process and an updated one simply misses.
+    """
+    vector = np.asarray(json.loads(raw_embedding), dtype=np.float32)
+    vector.setflags(write=False)
+    return vector
+
+
+@functools.lru_cache(maxsize=None)
+def _load_sentence_transformer(model_name: str):
+    """
+    Load a Sentence-Transformers model once per process.
+
+    Services are built per request, so without sharing every request would
+    reload the model weights from disk.
+    """
+    from sentence_transformers import SentenceTransformer
+
+    return SentenceTransformer(model_name)
+
 
 class ProbabilityCalibrationService:
     """
@@ -87,10 +151,19 @@ class ProbabilityCalibrationService:
             return scores
 
         try:
+            # Evaluate the fitted curves directly, skipping sklearn's per-call
+            # input validation and 2D reshaping
             if self.calibration_type == "isotonic":
-                calibrated = self.calibrator.transform(scores.reshape(-1, 1)).flatten()
+                # np.interp clamps beyond the end knots, as out_of_bounds="clip"
+                calibrated = np.interp(
+                    scores,
+                    self.calibrator.X_thresholds_,
+                    self.calibrator.y_thresholds_,
+                )
             else:  # platt
-                calibrated = self.calibrator.predict_proba(scores.reshape(-1, 1))[:, 1]
+                calibrated = expit(
+                    self.calibrator.coef_[0, 0] * scores + self.calibrator.intercept_[0]
+                )
 
             # Ensure probabilities are in [0, 1] range
             calibrated = np.clip(calibrated, 0.0, 1.0)
@@ -247,14 +320,18 @@ class VectorEmbeddingService:
     def _load_model(self):
         """Load the Sentence-Transformers model."""
         try:
-            from sentence_transformers import SentenceTransformer
-
-            self.model = SentenceTransformer(self.model_name)
+            self.model = _load_sentence_transformer(self.model_name)
             self.logger.info(f"Loaded embedding model: {self.model_name}")
         except Exception as e:
             self.logger.error(f"Failed to load embedding model: {e}")
             raise
 
+    def _cache_key(self, text: str) -> str:
+        """Build the embedding cache key, stable across worker processes."""
+        # hash() is salted per process, so it would miss between workers
+        digest = hashlib.sha1(text.encode(), usedforsecurity=False).hexdigest()
+        return f"embedding_{self.model_name}_{digest}"
+
     def generate_embedding(self, text: str) -> np.ndarray:
         """
         Generate embedding for a single text with caching.
@@ -269,7 +346,7 @@ class VectorEmbeddingService:
             self._load_model()
 
         # Check cache first
-        cache_key = f"embedding_{self.model_name}_{hash(text)}"
+        cache_key = self._cache_key(text)
         cached_embedding = cache.get(cache_key)
 
         if cached_embedding is not None:
@@ -277,7 +354,10 @@ class VectorEmbeddingService:
             return cached_embedding
 
         try:
-            embedding = self.model.encode(text, convert_to_numpy=True)
+            # float32 halves the cached payload and matches the similarity maths
+            embedding = np.ascontiguousarray(
+                self.model.encode(text, convert_to_numpy=True), dtype=np.float32
+            )
 
             # Cache the embedding
             cache.set(cache_key, embedding, self.cache_timeout)
@@ -301,42 +381,35 @@ class VectorEmbeddingService:
         if not self.model:
             self._load_model()
 
-        # Check cache for each text
-        embeddings = []
-        texts_to_process = []
-        text_indices = []
-
-        for i, text in enumerate(texts):
-            cache_key = f"embedding_{self.model_name}_{hash(text)}"
-            cached_embedding = cache.get(cache_key)
-
-            if cached_embedding is not None:
-                embeddings.append(cached_embedding)
-            else:
-                texts_to_process.append(text)
-                text_indices.append(i)
-                embeddings.append(None)  # Placeholder
+        # Fetch every cached embedding in one round trip
+        cache_keys = [self._cache_key(text) for text in texts]
+        cached = cache.get_many(cache_keys)
+        embeddings = [cached.get(key) for key in cache_keys]
+        missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
 
         # Process uncached texts
-        if texts_to_process:
+        if missing:
             try:
-                new_embeddings = self.model.encode(
-                    texts_to_process, convert_to_numpy=True
+                new_embeddings = np.ascontiguousarray(
+                    self.model.encode(
+                        [texts[i] for i in missing], convert_to_numpy=True
+                    ),
+                    dtype=np.float32,
                 )
 
-                # Cache new embeddings and update results
-                for i, (text, embedding) in enumerate(
-                    zip(texts_to_process, new_embeddings)
-                ):
-                    cache_key = f"embedding_{self.model_name}_{hash(text)}"
-                    cache.set(cache_key, embedding, self.cache_timeout)
-                    embeddings[text_indices[i]] = embedding
+                # Cache new embeddings in one round trip and update results
+                for i, embedding in zip(missing, new_embeddings):
+                    embeddings[i] = embedding
+                cache.set_many(
+                    {cache_keys[i]: embeddings[i] for i in missing},
+                    self.cache_timeout,
+                )
 
             except Exception as e:
                 self.logger.error(f"Failed to generate batch embeddings: {e}")
                 raise
 
-        return np.array(embeddings)
+        return np.array(embeddings, dtype=np.float32)
 
     def calculate_similarity(
         self, embedding1: np.ndarray, embedding2: np.ndarray
@@ -352,12 +425,45 @@ class VectorEmbeddingService:
             Cosine similarity score (0-1)
         """
         try:
-            similarity = cosine_similarity([embedding1], [embedding2])[0][0]
-            return float(similarity)
+            # Plain NumPy avoids sklearn's per-call input validation and 2D
+            # wrapping; zero vectors score 0 as they do in sklearn
+            norm_product = np.linalg.norm(embedding1) * np.linalg.norm(embedding2)
+            if not norm_product:
+                return 0.0
+            return float(np.dot(embedding1, embedding2) / norm_product)
         except Exception as e:
             self.logger.error(f"Failed to calculate similarity: {e}")
             raise
 
+    def similarity_batch(
+        self, query_embedding: np.ndarray, embedding_matrix: np.ndarray
+    ) -> np.ndarray:
+        """
+        Calculate cosine similarity between one embedding and many at once.
+
+        Args:
+            query_embedding: Query embedding vector
+            embedding_matrix: Matrix with one embedding per row
+
+        Returns:
+            Array of cosine similarity scores, one per row
+        """
+        try:
+            query = np.asarray(query_embedding, dtype=np.float32)
+            matrix = np.asarray(embedding_matrix, dtype=np.float32)
+
+            # einsum sums each row's squares in one pass without materialising
+            # the squared matrix; zero vectors score 0, as in
+            # calculate_similarity
+            query_norm_sq = float(query @ query) or 1.0
+            row_norms_sq = np.einsum("ij,ij->i", matrix, matrix)
+            row_norms_sq[row_norms_sq == 0] = 1.0
+
+            return (matrix @ query) / np.sqrt(row_norms_sq * query_norm_sq)
+        except Exception as e:
+            self.logger.error(f"Failed to calculate batch similarity: {e}")
+            raise
+
     def update_psychologist_embedding(self, psychologist: Psychologist) -> bool:
         """
         Update embedding for a psychologist.
@@ -420,13 +526,39 @@ class BM25Service:
     Service for BM25-based lexical search.
     """
 
-    def __init__(self, cache_timeout: int = 1800):
+    # Fitted (vectorizer, weights, idf) per index version, shared per process
+    FITTED_INDEX_LIMIT = 16
+    _fitted_indexes: OrderedDict[str, tuple] = OrderedDict()
+    # Threaded workers share the memo, so guard each lookup and eviction
+    _fitted_indexes_lock = threading.Lock()
+
+    def __init__(self, cache_timeout: int = 1800, k1: float = 1.5, b: float = 0.75):
+        """
+        Initialize the BM25 service.
+
+        Args:
+            cache_timeout: Cache timeout in seconds (default: 30 minutes)
+            k1: Term frequency saturation
+            b: Document length normalisation
+        """
         self.vectorizer = None
         self.document_vectors = None
+        self.idf = None
         self.document_ids = []
+        self.index_version = None
+        self.k1 = k1
+        self.b = b
         self.cache_timeout = cache_timeout
         self.logger = logging.getLogger(f"{__name__}.{self.__class__.__name__}")
 
+    @classmethod
+    def clear_fitted_indexes(cls) -> None:
+        """
+        Forget every fitted index shared by this process.
+        """
+        with cls._fitted_indexes_lock:
+            cls._fitted_indexes.clear()
+
     def build_index(self, psychologists: QuerySet[Psychologist]) -> bool:
         """
         Build BM25 index from psychologists.
@@ -468,7 +600,26 @@ class BM25Service:
                 self.logger.warning("No documents to index")
                 return False
 
-            # Build TF-IDF vectors
+            # Version the index by its content and scoring parameters
+            corpus_digest = hashlib.blake2b(
+                f"{self.k1}\0{self.b}\0".encode(), digest_size=16
+            )
+            for psychologist_id, document in zip(self.document_ids, documents):
+                corpus_digest.update(f"{psychologist_id}\0{document}\0".encode())
+            self.index_version = corpus_digest.hexdigest()
+
+            # Hybrid search rebuilds per request, usually over an unchanged
+            # corpus, so reuse a fitted index rather than re-tokenising
+            with self._fitted_indexes_lock:
+                fitted = self._fitted_indexes.get(self.index_version)
+                if fitted is not None:
+                    self._fitted_indexes.move_to_end(self.index_version)
+            if fitted is not None:
+                self.vectorizer, self.document_vectors, self.idf = fitted
+                self.logger.debug(f"Reused BM25 index {self.index_version}")
+                return True
+
+            # Build BM25 term weights
             # Adjust parameters for small datasets
             min_df = max(1, len(documents) // 10) if len(documents) > 1 else 1
             max_df = (
@@ -477,15 +628,28 @@ class BM25Service:
                 else 0.95
             )
 
-            self.vectorizer = TfidfVectorizer(
+            self.vectorizer = CountVectorizer(
                 max_features=10000,
                 stop_words="english",
                 ngram_range=(1, 2),
                 min_df=min_df,
                 max_df=max_df,
+                dtype=np.float32,
             )
 
-            self.document_vectors = self.vectorizer.fit_transform(documents)
+            # Keep the sparse CSR matrix: a dense copy would cost
+            # documents x vocabulary memory for mostly zero entries
+            term_counts = self.vectorizer.fit_transform(documents).tocsr()
+            self.document_vectors = self._bm25_weights(term_counts)
+
+            with self._fitted_indexes_lock:
+                self._fitted_indexes[self.index_version] = (
+                    self.vectorizer,
+                    self.document_vectors,
+                    self.idf,
+                )
+                if len(self._fitted_indexes) > self.FITTED_INDEX_LIMIT:
+                    self._fitted_indexes.popitem(last=False)
 
             self.logger.info(f"Built BM25 index with {len(documents)} documents")
             return True
@@ -494,6 +658,41 @@ class BM25Service:
             self.logger.error(f"Failed to build BM25 index: {e}")
             return False
 
+    def _bm25_weights(self, term_counts):
+        """
+        Turn a document-term count matrix into Okapi BM25 term weights.
+
+        Args:
+            term_counts: CSR matrix of term counts, one row per document
+
+        Returns:
+            CSR matrix of BM25 weights with the same sparsity
+        """
+        n_documents, n_terms = term_counts.shape
+        document_lengths = np.asarray(term_counts.sum(axis=1)).ravel()
+        average_length = document_lengths.mean() or 1.0
+
+        # Lucene's non-negative idf, so very common terms never score below 0
+        document_frequency = np.bincount(term_counts.indices, minlength=n_terms)
+        self.idf = np.log1p(
+            (n_documents - document_frequency + 0.5) / (document_frequency + 0.5)
+        ).astype(np.float32)
+
+        # Saturate each stored count against its document's relative length
+        rows = np.repeat(np.arange(n_documents), np.diff(term_counts.indptr))
+        counts = term_counts.data
+        length_norm = self.k1 * (
+            1 - self.b + self.b * document_lengths[rows] / average_length
+        )
+        weights = term_counts.copy()
+        weights.data = (
+            self.idf[term_counts.indices]
+            * counts
+            * (self.k1 + 1)
+            / (counts + length_norm)
+        ).astype(np.float32)
+        return weights
+
     def search(self, query: str, top_k: int = 10) -> list[tuple[str, float]]:
         """
         Search using BM25 with caching.
@@ -509,59 +708,107 @@ class BM25Service:
             self.logger.warning("BM25 index not built")
             return []
 
-        # Check cache first
-        cache_key = f"bm25_search_{hash(query)}_{top_k}_{len(self.document_ids)}"
-        cached_results = cache.get(cache_key)
-
-        if cached_results is not None:
-            self.logger.debug(f"Cache hit for BM25 search: {cache_key}")
-            return cached_results
+        # Key on the indexed content, so identical corpora share results across
+        # workers and rebuilds while a changed corpus never reads stale ones
+        query_digest = hashlib.blake2b(query.encode(), digest_size=16).hexdigest()
+        cache_key = f"bm25_search_{self.index_version}_{query_digest}_{top_k}"
 
         try:
-            # Transform query
-            query_vector = self.vectorizer.transform([query])
+            return cache.get_or_set(
+                cache_key,
+                lambda: self._search_uncached(query, top_k),
+                self.cache_timeout,
+            )
 
-            # Calculate similarities
-            similarities = cosine_similarity(
-                query_vector, self.document_vectors
-            ).flatten()
+        except Exception as e:
+            self.logger.error(f"BM25 search failed: {e}")
+            return []
 
-            # Get top-k results
-            top_indices = similarities.argsort()[-top_k:][::-1]
+    def _search_uncached(self, query: str, top_k: int) -> list[tuple[str, float]]:
+        """
+        Score the indexed documents against a query.
 
-            results = []
-            for idx in top_indices:
-                if similarities[idx] > 0:
-                    psychologist_id = self.document_ids[idx]
-                    score = float(similarities[idx])
-                    results.append((psychologist_id, score))
+        Args:
+            query: Search query
+            top_k: Number of top results to return
 
-            # Cache the results
-            cache.set(cache_key, results, self.cache_timeout)
-            self.logger.debug(f"Cached BM25 search results: {cache_key}")
+        Returns:
+            List of (psychologist_id, score) tuples
+        """
+        # Transform query; each query term counts once
+        query_vector = self.vectorizer.transform([query])
+        query_vector.data[:] = 1
+
+        # The weights are precomputed, so BM25 scoring is one sparse
+        # product that only touches the non-zero terms
+        scores = (self.document_vectors @ query_vector.T).toarray().ravel()
+
+        # An average-length document holding each query term once scores
+        # the idf sum, so dividing by it puts a full match near 1 like the
+        # cosine scores the hybrid weights and routing thresholds were tuned
+        # on. Short or repetitive documents can score higher, so divide by
+        # the best score instead when one passes it; clipping would tie them
+        upper_bound = max(float(self.idf[query_vector.indices].sum()), scores.max())
+        if not upper_bound:
+            return []
+        similarities = scores / upper_bound
 
-            return results
+        # Get top-k results; partitioning is linear, so only the k winners
+        # get sorted
+        if top_k < similarities.size:
+            top_indices = np.argpartition(similarities, -top_k)[-top_k:]
+        else:
+            top_indices = np.arange(similarities.size)
+        top_indices = top_indices[np.argsort(-similarities[top_indices])]
 
-        except Exception as e:
-            self.logger.error(f"BM25 search failed: {e}")
-            return []
+        results = []
+        for idx in top_indices:
+            if similarities[idx] > 0:
+                psychologist_id = self.document_ids[idx]
+                score = float(similarities[idx])
+                results.append((psychologist_id, score))
+
+        self.logger.debug(f"Scored BM25 search over {len(self.document_ids)} documents")
+        return results
 
 
 class HybridRetrievalService:
     """
     Service that combines vector similarity and BM25 for hybrid retrieval.
+
+    Both fusion methods score in 0-1 so calibration and threshold routing
+    see the same scale: rank fusion is rescaled so first place in both
+    rankings scores 1.
     """
 
-    def __init__(self, vector_weight: float = 0.7, bm25_weight: float = 0.3):
+    FUSION_METHODS = ("weighted", "rrf")
+
+    def __init__(
+        self,
+        vector_weight: float = 0.7,
+        bm25_weight: float = 0.3,
+        fusion: str = "weighted",
+        rrf_k: int = 60,
+    ):
         """
         Initialize hybrid retrieval service.
 
         Args:
             vector_weight: Weight for vector similarity (0-1)
             bm25_weight: Weight for BM25 score (0-1)
+            fusion: How to combine the two rankings ('weighted' or 'rrf')
+            rrf_k: Rank offset for reciprocal rank fusion
+
+        Raises:
+            ValueError: If fusion is not one of FUSION_METHODS
         """
+        if fusion not in self.FUSION_METHODS:
+            raise ValueError(f"Unknown fusion method: {fusion}")
+
         self.vector_weight = vector_weight
         self.bm25_weight = bm25_weight
+        self.fusion = fusion
+        self.rrf_k = rrf_k
         self.vector_service = VectorEmbeddingService()
         self.bm25_service = BM25Service()
         self.logger = logging.getLogger(f"{__name__}.{self.__class__.__name__}")
@@ -597,79 +844,100 @@ class HybridRetrievalService:
             # Get vector results
             query_embedding = self.vector_service.generate_embedding(query)
 
-            # Calculate vector similarities
+            # Calculate vector similarities in one matrix product
+            embedded, embedding_matrix = self._embedding_matrix(
+                psychologists, len(query_embedding)
+            )
             vector_results = []
-            for psychologist in psychologists:
-                if psychologist.embedding:
-                    try:
-                        psych_embedding = psychologist.get_embedding()
-                        if psych_embedding is not None:
-                            similarity = self.vector_service.calculate_similarity(
-                                query_embedding, psych_embedding
-                            )
-                            vector_results.append((psychologist.id, similarity))
-                    except Exception as e:
-                        self.logger.warning(
-                            f"Failed to get embedding for psychologist {psychologist.id}: {e}"
-                        )
-                        continue
-
-            # Sort vector results by similarity
-            vector_results.sort(key=lambda x: x[1], reverse=True)
-            vector_scores = {psych_id: score for psych_id, score in vector_results}
-
-            # Combine scores
-            combined_scores = {}
-            all_psych_ids = set(bm25_scores.keys()) | set(vector_scores.keys())
+            if embedded:
+                similarities = self.vector_service.similarity_batch(
+                    query_embedding, embedding_matrix
+                )
+                vector_results = [
+                    (psychologist.id, similarity)
+                    for psychologist, similarity in zip(embedded, similarities.tolist())
+                ]
 
-            for psych_id in all_psych_ids:
-                bm25_score = bm25_scores.get(psych_id, 0.0)
-                vector_score = vector_scores.get(psych_id, 0.0)
+            vector_scores = dict(vector_results)
 
-                # Normalize scores to 0-1 range
-                combined_score = (
-                    self.vector_weight * vector_score + self.bm25_weight * bm25_score
+            # Combine scores
+            if self.fusion == "rrf":
+                # Only rank fusion needs the vector results in rank order
+                vector_results.sort(key=_PAIR_SCORE_KEY, reverse=True)
+                combined_scores = self._reciprocal_rank_fusion(
+                    vector_results, bm25_results
                 )
-                combined_scores[psych_id] = combined_score
+            else:
+                combined_scores = {
+                    psych_id: self.vector_weight * vector_scores.get(psych_id, 0.0)
+                    + self.bm25_weight * bm25_scores.get(psych_id, 0.0)
+                    for psych_id in vector_scores.keys() | bm25_scores.keys()
+                }
 
             # Sort by combined score
             sorted_results = sorted(
-                combined_scores.items(), key=lambda x: x[1], reverse=True
+                combined_scores.items(), key=_PAIR_SCORE_KEY, reverse=True
             )
 
             # Get top-k results
             top_results = sorted_results[:top_k]
 
-            # Build result dictionaries
+            # Build result dictionaries from the already-loaded psychologists
+            psychologists_by_id = {
+                psychologist.id: psychologist for psychologist in psychologists
+            }
             results = []
             for psych_id, score in top_results:
-                try:
-                    psychologist = psychologists.get(id=psych_id)
-                    result = {
-                        "psychologist": psychologist,
-                        "score": score,
-                        "vector_score": vector_scores.get(psych_id, 0.0),
-                        "bm25_score": bm25_scores.get(psych_id, 0.0),
-                        "explanation": {
-                            "hybrid_search": True,
-                            "vector_weight": self.vector_weight,
-                            "bm25_weight": self.bm25_weight,
-                        },
-                    }
-                    results.append(result)
-                except Psychologist.DoesNotExist:
+                psychologist = psychologists_by_id.get(psych_id)
+                if psychologist is None:
                     self.logger.warning(
                         f"Psychologist {psych_id} not found in queryset"
                     )
                     continue
+                result = {
+                    "psychologist": psychologist,
+                    "score": score,
+                    "vector_score": vector_scores.get(psych_id, 0.0),
+                    "bm25_score": bm25_scores.get(psych_id, 0.0),
+                    "explanation": {
+                        "hybrid_search": True,
+                        "fusion": self.fusion,
+                        "vector_weight": self.vector_weight,
+                        "bm25_weight": self.bm25_weight,
+                    },
+                }
+                results.append(result)
 
-            self.logger.info(f"Hybrid search returned {len(results)} results")
+            self.logger.debug(f"Hybrid search returned {len(results)} results")
             return results
 
         except Exception as e:
             self.logger.error(f"Hybrid search failed: {e}")
             return []
 
+    def _reciprocal_rank_fusion(
+        self, *rankings: list[tuple[str, float]]
+    ) -> dict[str, float]:
+        """
+        Fuse rankings by summing 1 / (k + rank) for each one a result appears in.
+
+        Raw sums top out at len(rankings) / (k + 1), far below the routing
+        thresholds, so they are rescaled to make first place everywhere 1.
+
+        Args:
+            rankings: Lists of (psychologist_id, score) tuples, best first
+
+        Returns:
+            Dictionary of psychologist_id -> fused score in 0-1
+        """
+        fused: dict[str, float] = {}
+        for ranking in rankings:
+            for rank, (psych_id, _) in enumerate(ranking, start=1):
+                fused[psych_id] = fused.get(psych_id, 0.0) + 1.0 / (self.rrf_k + rank)
+
+        scale = (self.rrf_k + 1) / len(rankings)
+        return {psych_id: score * scale for psych_id, score in fused.items()}
+
     def _vector_only_search(
         self, query: str, psychologists: QuerySet[Psychologist], top_k: int
     ) -> list[dict[str, Any]]:
@@ -677,41 +945,76 @@ class HybridRetrievalService:
         try:
             query_embedding = self.vector_service.generate_embedding(query)
 
-            results = []
-            for psychologist in psychologists:
-                if psychologist.embedding:
-                    try:
-                        psych_embedding = psychologist.get_embedding()
-                        if psych_embedding is not None:
-                            similarity = self.vector_service.calculate_similarity(
-                                query_embedding, psych_embedding
-                            )
-                            results.append(
-                                {
-                                    "psychologist": psychologist,
-                                    "score": similarity,
-                                    "vector_score": similarity,
-                                    "bm25_score": 0.0,
-                                    "explanation": {
-                                        "hybrid_search": False,
-                                        "vector_only": True,
-                                    },
-                                }
-                            )
-                    except Exception as e:
-                        self.logger.warning(
-                            f"Failed to get embedding for psychologist {psychologist.id}: {e}"
-                        )
-                        continue
+            embedded, embedding_matrix = self._embedding_matrix(
+                psychologists, len(query_embedding)
+            )
+            if not embedded:
+                return []
+
+            similarities = self.vector_service.similarity_batch(
+                query_embedding, embedding_matrix
+            )
+            results = [
+                {
+                    "psychologist": psychologist,
+                    "score": similarity,
+                    "vector_score": similarity,
+                    "bm25_score": 0.0,
+                    "explanation": {
+                        "hybrid_search": False,
+                        "vector_only": True,
+                    },
+                }
+                for psychologist, similarity in zip(embedded, similarities.tolist())
+            ]
 
             # Sort by score and return top-k
-            results.sort(key=lambda x: x["score"], reverse=True)
+            results.sort(key=_SCORE_KEY, reverse=True)
             return results[:top_k]
 
         except Exception as e:
             self.logger.error(f"Vector-only search failed: {e}")
             return []
 
+    def _embedding_matrix(
+        self, psychologists: QuerySet[Psychologist], dimension: int
+    ) -> tuple[list[Psychologist], np.ndarray]:
+        """
+        Stack psychologist embeddings into a contiguous float32 matrix.
+
+        Args:
+            psychologists: Psychologists to collect embeddings from
+            dimension: Embedding length the query uses
+
+        Returns:
+            Tuple of (psychologists with embeddings, matrix with one row each)
+        """
+        embedded = []
+        rows = []
+        for psychologist in psychologists:
+            if psychologist.embedding:
+                try:
+                    row = _parse_embedding(psychologist.embedding)
+                except Exception as e:
+                    self.logger.warning(
+                        f"Failed to get embedding for psychologist {psychologist.id}: {e}"
+                    )
+                    continue
+
+                # A stale or corrupt embedding would make the matrix ragged
+                # and fail the whole search, so skip just that psychologist
+                if row.shape != (dimension,):
+                    self.logger.warning(
+                        f"Skipping embedding for psychologist {psychologist.id}: "
+                        f"shape {row.shape}, expected ({dimension},)"
+                    )
+                    continue
+
+                rows.append(row)
+                embedded.append(psychologist)
+
+        return embedded, np.array(rows, dtype=np.float32)
+
 
 class FeasibilityFilter:
     """
@@ -738,12 +1041,16 @@ class FeasibilityFilter:
             Filtered queryset of psychologists
         """
         if psychologists is None:
-            psychologists = Psychologist.objects.filter(
-                is_active=True, is_accepting_referrals=True
-            ).select_related("user")
+            psychologists = (
+                Psychologist.objects.filter(is_active=True, is_accepting_referrals=True)
+                .select_related("user")
+                .only(*_MATCHING_FIELDS)
+            )
 
-        self.logger.info(f"Starting feasibility filter for referral {referral.id}")
-        initial_count = psychologists.count()
+        # Counting costs a query each, so only do it when debug logging is on
+        log_counts = self.logger.isEnabledFor(logging.DEBUG)
+        if log_counts:
+            initial_count = psychologists.count()
 
         # Apply filters in order of selectivity (most selective first)
         psychologists = self._filter_by_service_type(psychologists, referral)
@@ -752,10 +1059,12 @@ class FeasibilityFilter:
         psychologists = self._filter_by_radius(psychologists, referral)
         psychologists = self._filter_by_capacity(psychologists, referral)
 
-        final_count = psychologists.count()
-        self.logger.info(
-            f"Feasibility filter complete: {initial_count} -> {final_count} psychologists"
-        )
+        if log_counts:
+            final_count = psychologists.count()
+            self.logger.debug(
+                f"Feasibility filter for referral {referral.id}: "
+                f"{initial_count} -> {final_count} psychologists"
+            )
 
         return psychologists
 
@@ -874,12 +1183,15 @@ class MatchingService:
         Returns:
             List of match dictionaries with psychologist and score
         """
-        self.logger.info(f"Starting matching process for referral {referral.id}")
+        start_time = time.perf_counter()
+        self.logger.debug(f"Starting matching process for referral {referral.id}")
 
         # Step 1: Apply feasibility filter
         feasible_psychologists = self.feasibility_filter.filter_psychologists(referral)
 
-        if not feasible_psychologists.exists():
+        # Evaluating the queryset fills its result cache, so retrieval below
+        # iterates these rows rather than issuing a second query
+        if not feasible_psychologists:
             self.logger.warning(
                 f"No feasible psychologists found for referral {referral.id}"
             )
@@ -902,18 +1214,19 @@ class MatchingService:
             matches = self._apply_calibration(matches)
 
         # Step 6: Add feasibility explanation to each match
+        # The explanation is identical for every match, so build it once
+        explanation_update = {
+            "feasibility_passed": True,
+            "service_type_match": True,
+            "modality_match": True,
+            "radius_match": True,
+            "capacity_available": True,
+            "calibrated": bool(
+                self.calibration_service and self.calibration_service.is_fitted
+            ),
+        }
         for match in matches:
-            match["explanation"].update(
-                {
-                    "feasibility_passed": True,
-                    "service_type_match": True,
-                    "modality_match": True,
-                    "radius_match": True,
-                    "capacity_available": True,
-                    "calibrated": self.calibration_service is not None
-                    and self.calibration_service.is_fitted,
-                }
-            )
+            match["explanation"].update(explanation_update)
 
         # Step 7: Apply threshold routing
         routing_decision = self._apply_threshold_routing(matches, referral)
@@ -929,7 +1242,21 @@ class MatchingService:
                 f"Failed to route referral {referral.id}, keeping in matching status"
             )
 
-        self.logger.info(f"Found {len(matches)} matches for referral {referral.id}")
+        # Emit a single structured INFO record per referral
+        log_ctx = {
+            "referral_id": str(referral.id),
+            "n_matches": len(matches),
+            "routing_decision": routing_decision["decision"],
+            "highest_score": routing_decision["highest_score"],
+            "calibrated": explanation_update["calibrated"],
+            "duration_ms": round((time.perf_counter() - start_time) * 1000, 2),
+        }
+        self.logger.info(
+            f"Matching complete for referral {referral.id}: "
+            f"{log_ctx['n_matches']} matches, decision {log_ctx['routing_decision']} "
+            f"in {log_ctx['duration_ms']}ms",
+            extra=log_ctx,
+        )
         return matches, routing_decision
 
     def _create_search_query(self, referral: Referral) -> str:
@@ -998,7 +1325,7 @@ class MatchingService:
             matches.append(match)
 
         # Sort by score
-        matches.sort(key=lambda x: x["score"], reverse=True)
+        matches.sort(key=_SCORE_KEY, reverse=True)
         return matches
 
     def _calculate_structured_score(
@@ -1053,39 +1380,18 @@ class MatchingService:
         if not psychologist.specialisms:
             return 0.0
 
-        required_matches = 0
-        preferred_matches = 0
-
-        if referral.required_specialisms:
-            for req_spec in referral.required_specialisms:
-                if req_spec in psychologist.specialisms:
-                    required_matches += 1
-
-        if referral.required_specialisms:
-            for pref_spec in referral.required_specialisms:
-                if pref_spec in psychologist.specialisms:
-                    preferred_matches += 1
-
-        # Calculate score
-        total_required = (
-            len(referral.required_specialisms) if referral.required_specialisms else 0
-        )
-        total_preferred = (
-            len(referral.required_specialisms) if referral.required_specialisms else 0
-        )
-
-        if total_required == 0 and total_preferred == 0:
+        if not referral.required_specialisms:
             return 1.0  # No specialism requirements
 
-        required_score = (
-            required_matches / total_required if total_required > 0 else 1.0
-        )
-        preferred_score = (
-            preferred_matches / total_preferred if total_preferred > 0 else 1.0
+        # Referrals only carry required specialisms, so the score is the
+        # fraction of them the psychologist covers
+        required_matches = sum(
+            1
+            for req_spec in referral.required_specialisms
+            if req_spec in psychologist.specialisms
         )
 
-        # Weight required more heavily
-        return (required_score * 0.7) + (preferred_score * 0.3)
+        return required_matches / len(referral.required_specialisms)
 
     def _calculate_language_score(
         self, psychologist: Psychologist, referral: Referral
@@ -1186,24 +1492,39 @@ class MatchingService:
         if not self.calibration_service or not self.calibration_service.is_fitted:
             return matches
 
+        if not matches:
+            return matches
+
         try:
-            # Extract raw scores
-            raw_scores = np.array([match["score"] for match in matches])
+            # Extract raw scores into a single array
+            raw_scores = np.fromiter(
+                map(_SCORE_KEY, matches), dtype=np.float64, count=len(matches)
+            )
 
             # Calibrate scores
-            calibrated_scores = self.calibration_service.calibrate_scores(raw_scores)
+            calibrated_scores = np.asarray(
+                self.calibration_service.calibrate_scores(raw_scores),
+                dtype=np.float64,
+            )
 
-            # Update matches with calibrated scores
-            for i, match in enumerate(matches):
-                match["raw_score"] = match["score"]
-                match["score"] = float(calibrated_scores[i])
-                match["explanation"]["calibrated_score"] = float(calibrated_scores[i])
-                match["explanation"]["raw_score"] = float(raw_scores[i])
+            # Order by calibrated score on the array (stable, so ties keep
+            # retrieval order) instead of re-sorting the match dicts
+            order = np.argsort(-calibrated_scores, kind="stable")
 
-            # Re-sort by calibrated scores
-            matches.sort(key=lambda x: x["score"], reverse=True)
+            # Convert to Python floats in one pass and update matches
+            raw_list = raw_scores.tolist()
+            calibrated_list = calibrated_scores.tolist()
+            for match, raw_score, calibrated_score in zip(
+                matches, raw_list, calibrated_list
+            ):
+                match["raw_score"] = raw_score
+                match["score"] = calibrated_score
+                match["explanation"]["calibrated_score"] = calibrated_score
+                match["explanation"]["raw_score"] = raw_score
 
-            self.logger.info(f"Applied calibration to {len(matches)} matches")
+            matches = [matches[i] for i in order.tolist()]
+
+            self.logger.debug(f"Applied calibration to {len(matches)} matches")
             return matches
 
         except Exception as e:
@@ -1322,7 +1643,7 @@ class MatchingService:
             if not matches:
                 highest_score = 0.0
             else:
-                highest_score = max(match["score"] for match in matches)
+                highest_score = max(matches, key=_SCORE_KEY)["score"]
 
             # Determine routing decision
             if highest_score >= auto_threshold:
@@ -1345,7 +1666,7 @@ class MatchingService:
                 "match_count": len(matches),
             }
 
-            self.logger.info(
+            self.logger.debug(
                 f"Threshold routing for referral {referral.id}: {routing_decision} - {reason}"
             )
             return routing_info
@@ -1373,16 +1694,5 @@ class MatchingService:
             User type string for threshold lookup
         """
         # This is a simplified mapping - in a real system you'd check user roles/groups
-        if hasattr(referrer, "role"):
-            role = referrer.role
-            if role in ["gp", "doctor", "referrer"]:
-                return "gp"
-            elif role in ["patient"]:
-                return "patient"
-            elif role in ["psychologist"]:
-                return "psychologist"
-            elif role in ["admin", "administrator"]:
-                return "admin"
-
         # Default to GP for now
-        return "gp"
+        return _ROLE_TO_USER_TYPE.get(getattr(referrer, "role", None), "gp")
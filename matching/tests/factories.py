@@ -0,0 +1,43 @@
+"""
+Test factories for matching tests.
+"""
+import factory
+from factory.django import DjangoModelFactory
+
+from django.contrib.auth.hashers import make_password
+
+from accounts.models import User
+from referrals.models import Referral
+
+# Hash the shared test password once rather than per created user
+PASSWORD_HASH = make_password("testpass123")
+
+
+class UserFactory(DjangoModelFactory):
+    """Factory for users with unique sequence-based emails."""
+
+    class Meta:
+        model = User
+
+    email = factory.Sequence(lambda n: f"user{n}@example.com")
+    username = factory.SelfAttribute("email")
+    password = PASSWORD_HASH
+    first_name = "Test"
+    last_name = "User"
+    phone = "1234567890"
+    user_type = User.UserType.GP
+
+
+class ReferralFactory(DjangoModelFactory):
+    """Factory for in-person NHS referrals from a GP for a patient user."""
+
+    class Meta:
+        model = Referral
+
+    referrer = factory.SubFactory(UserFactory)
+    patient = factory.SubFactory(
+        UserFactory, last_name="Patient", user_type=User.UserType.PATIENT
+    )
+    presenting_problem = "Test problem"
+    service_type = Referral.ServiceType.NHS
+    modality = Referral.Modality.IN_PERSON
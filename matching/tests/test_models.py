@@ -1,29 +1,54 @@
 """
 Tests for matching models.
 """
+from datetime import timedelta
 
+from django.contrib import admin
+from django.db import IntegrityError, transaction
 from django.test import TestCase
+from django.utils import timezone
 
+from matching.admin import MatchingRunAdmin
 from matching.models import (
     CalibrationModel,
     MatchingAlgorithm,
     MatchingRun,
     MatchingThreshold,
 )
+from matching.tests.factories import ReferralFactory
+
+# Field values shared by the MatchingRun tests
+RUN_FIELDS = {
+    "algorithm_name": "Test Algorithm",
+    "algorithm_version": "1.0",
+    "total_referrals": 100,
+    "successful_matches": 80,
+    "failed_matches": 20,
+    "average_confidence": 0.75,
+    "processing_time_seconds": 30.5,
+}
+
+# A fixed run window for the duration tests, built once at import
+RUN_STARTED_AT = timezone.now()
+RUN_DURATION = timedelta(seconds=30.5)
 
 
 class TestMatchingAlgorithm(TestCase):
     """Test MatchingAlgorithm model."""
 
-    def test_creation(self):
-        """Test creating a matching algorithm."""
-        algorithm = MatchingAlgorithm.objects.create(
+    @classmethod
+    def setUpTestData(cls):
+        cls.algorithm = MatchingAlgorithm.objects.create(
             name="Test Algorithm",
             version="1.0",
             algorithm_type="hybrid",
             config={"vector_weight": 0.7, "bm25_weight": 0.3},
         )
 
+    def test_creation(self):
+        """Test creating a matching algorithm."""
+        algorithm = self.algorithm
+
         self.assertEqual(algorithm.name, "Test Algorithm")
         self.assertEqual(algorithm.version, "1.0")
         self.assertEqual(algorithm.algorithm_type, "hybrid")
@@ -33,43 +58,42 @@ class TestMatchingAlgorithm(TestCase):
 
     def test_str_representation(self):
         """Test string representation."""
-        algorithm = MatchingAlgorithm.objects.create(
-            name="Test Algorithm", version="1.0", algorithm_type="hybrid"
-        )
-
         expected = "Test Algorithm v1.0"
-        self.assertEqual(str(algorithm), expected)
+        self.assertEqual(str(self.algorithm), expected)
 
     def test_unique_constraints(self):
         """Test unique constraints."""
-        MatchingAlgorithm.objects.create(
-            name="Test Algorithm", version="1.0", algorithm_type="hybrid"
-        )
-
         # Should not be able to create another with same name and version
-        with self.assertRaises(Exception):
+        with transaction.atomic(), self.assertRaises(IntegrityError):
             MatchingAlgorithm.objects.create(
                 name="Test Algorithm", version="1.0", algorithm_type="vector"
             )
 
     def test_default_algorithm(self):
         """Test setting default algorithm."""
-        algorithm1 = MatchingAlgorithm.objects.create(
-            name="Algorithm 1", version="1.0", algorithm_type="hybrid"
-        )
-        algorithm2 = MatchingAlgorithm.objects.create(
-            name="Algorithm 2", version="1.0", algorithm_type="vector"
+        # Neither starts as default, so skipping pre_save signals is safe here
+        algorithm1, algorithm2 = MatchingAlgorithm.objects.bulk_create(
+            [
+                MatchingAlgorithm(
+                    name="Algorithm 1", version="1.0", algorithm_type="hybrid"
+                ),
+                MatchingAlgorithm(
+                    name="Algorithm 2", version="1.0", algorithm_type="vector"
+                ),
+            ]
         )
 
         # Set algorithm1 as default
         algorithm1.is_default = True
-        algorithm1.save()
+        algorithm1.save(update_fields=["is_default"])
 
-        # Set algorithm2 as default should unset algorithm1
+        # Set algorithm2 as default should unset algorithm1, with the signal
+        # clearing every other default in one UPDATE alongside the save itself
         algorithm2.is_default = True
-        algorithm2.save()
+        with self.assertNumQueries(2):
+            algorithm2.save(update_fields=["is_default"])
 
-        algorithm1.refresh_from_db()
+        algorithm1.refresh_from_db(fields=["is_default"])
         self.assertFalse(algorithm1.is_default)
         self.assertTrue(algorithm2.is_default)
 
@@ -77,9 +101,9 @@ class TestMatchingAlgorithm(TestCase):
 class TestCalibrationModel(TestCase):
     """Test CalibrationModel model."""
 
-    def test_creation(self):
-        """Test creating a calibration model."""
-        model = CalibrationModel.objects.create(
+    @classmethod
+    def setUpTestData(cls):
+        cls.model = CalibrationModel.objects.create(
             name="Test Calibration",
             calibration_type="isotonic",
             version="1.0",
@@ -89,6 +113,10 @@ class TestCalibrationModel(TestCase):
             training_samples=1000,
         )
 
+    def test_creation(self):
+        """Test creating a calibration model."""
+        model = self.model
+
         self.assertEqual(model.name, "Test Calibration")
         self.assertEqual(model.calibration_type, "isotonic")
         self.assertEqual(model.version, "1.0")
@@ -101,39 +129,23 @@ class TestCalibrationModel(TestCase):
 
     def test_str_representation(self):
         """Test string representation."""
-        model = CalibrationModel.objects.create(
-            name="Test Calibration",
-            calibration_type="isotonic",
-            version="1.0",
-            model_data="{}",
-        )
-
         expected = "Test Calibration v1.0 (Isotonic Regression)"
-        self.assertEqual(str(model), expected)
+        self.assertEqual(str(self.model), expected)
 
     def test_calibration_type_choices(self):
         """Test calibration type choices."""
-        model = CalibrationModel.objects.create(
-            name="Test Calibration", calibration_type="isotonic", model_data="{}"
-        )
+        model = self.model
 
         self.assertEqual(model.get_calibration_type_display(), "Isotonic Regression")
 
         model.calibration_type = "platt"
-        model.save()
+        model.save(update_fields=["calibration_type"])
         self.assertEqual(model.get_calibration_type_display(), "Platt Scaling")
 
     def test_unique_constraints(self):
         """Test unique constraints."""
-        CalibrationModel.objects.create(
-            name="Test Calibration",
-            version="1.0",
-            calibration_type="isotonic",
-            model_data="{}",
-        )
-
         # Should not be able to create another with same name and version
-        with self.assertRaises(Exception):
+        with transaction.atomic(), self.assertRaises(IntegrityError):
             CalibrationModel.objects.create(
                 name="Test Calibration",
                 version="1.0",
@@ -145,12 +157,16 @@ class TestCalibrationModel(TestCase):
 class TestMatchingThreshold(TestCase):
     """Test MatchingThreshold model."""
 
-    def test_creation(self):
-        """Test creating a matching threshold."""
-        threshold = MatchingThreshold.objects.create(
+    @classmethod
+    def setUpTestData(cls):
+        cls.threshold = MatchingThreshold.objects.create(
             user_type="gp", auto_threshold=0.7, high_touch_threshold=0.5
         )
 
+    def test_creation(self):
+        """Test creating a matching threshold."""
+        threshold = self.threshold
+
         self.assertEqual(threshold.user_type, "gp")
         self.assertEqual(threshold.auto_threshold, 0.7)
         self.assertEqual(threshold.high_touch_threshold, 0.5)
@@ -158,33 +174,23 @@ class TestMatchingThreshold(TestCase):
 
     def test_str_representation(self):
         """Test string representation."""
-        threshold = MatchingThreshold.objects.create(
-            user_type="gp", auto_threshold=0.7, high_touch_threshold=0.5
-        )
-
         expected = "Thresholds for GP"
-        self.assertEqual(str(threshold), expected)
+        self.assertEqual(str(self.threshold), expected)
 
     def test_user_type_choices(self):
         """Test user type choices."""
-        threshold = MatchingThreshold.objects.create(
-            user_type="gp", auto_threshold=0.7, high_touch_threshold=0.5
-        )
+        threshold = self.threshold
 
         self.assertEqual(threshold.get_user_type_display(), "GP")
 
         threshold.user_type = "patient"
-        threshold.save()
+        threshold.save(update_fields=["user_type"])
         self.assertEqual(threshold.get_user_type_display(), "Patient")
 
     def test_unique_constraints(self):
         """Test unique constraints."""
-        MatchingThreshold.objects.create(
-            user_type="gp", auto_threshold=0.7, high_touch_threshold=0.5
-        )
-
         # Should not be able to create another with same user_type
-        with self.assertRaises(Exception):
+        with transaction.atomic(), self.assertRaises(IntegrityError):
             MatchingThreshold.objects.create(
                 user_type="gp", auto_threshold=0.8, high_touch_threshold=0.6
             )
@@ -193,7 +199,7 @@ class TestMatchingThreshold(TestCase):
         """Test threshold value validation."""
         # Auto threshold should be >= high touch threshold
         threshold = MatchingThreshold.objects.create(
-            user_type="gp",
+            user_type="patient",
             auto_threshold=0.5,
             high_touch_threshold=0.7,  # This should be <= auto_threshold
         )
@@ -206,50 +212,24 @@ class TestMatchingThreshold(TestCase):
 class TestMatchingRun(TestCase):
     """Test MatchingRun model."""
 
-    def test_creation(self):
-        """Test creating a matching run."""
-        # Create a test referral first
-        from accounts.models import User
-        from referrals.models import Referral
-
-        user = User.objects.create_user(
-            email="test@example.com",
-            password="testpass123",
-            first_name="Test",
-            last_name="User",
-            phone="1234567890",
-            user_type="gp",
-        )
+    @classmethod
+    def setUpTestData(cls):
+        # Every run hangs off the same referral, so build it once per class
+        cls.referral = ReferralFactory()
 
-        # Create a patient user
-        patient = User.objects.create_user(
-            email="patient@example.com",
-            password="testpass123",
-            first_name="Test",
-            last_name="Patient",
-            phone="1234567890",
-            user_type="patient",
-        )
+    def build_run(self, **overrides) -> MatchingRun:
+        """Build an unsaved run for the shared referral from RUN_FIELDS."""
+        return MatchingRun(referral=self.referral, **{**RUN_FIELDS, **overrides})
 
-        referral = Referral.objects.create(
-            referrer=user,
-            patient=patient,
-            presenting_problem="Test problem",
-            service_type="nhs",
-            modality="in_person",
-            priority="routine",
-        )
+    def create_run(self, **overrides) -> MatchingRun:
+        """Create a run for the shared referral from RUN_FIELDS plus overrides."""
+        run = self.build_run(**overrides)
+        run.save()
+        return run
 
-        run = MatchingRun.objects.create(
-            referral=referral,
-            algorithm_name="Test Algorithm",
-            algorithm_version="1.0",
-            total_referrals=100,
-            successful_matches=80,
-            failed_matches=20,
-            average_confidence=0.75,
-            processing_time_seconds=30.5,
-        )
+    def test_creation(self):
+        """Test creating a matching run."""
+        run = self.create_run()
 
         self.assertEqual(run.algorithm_name, "Test Algorithm")
         self.assertEqual(run.algorithm_version, "1.0")
@@ -263,295 +243,64 @@ class TestMatchingRun(TestCase):
 
     def test_str_representation(self):
         """Test string representation."""
-        # Create a test referral first
-        from accounts.models import User
-        from referrals.models import Referral
-
-        user = User.objects.create_user(
-            email="test@example.com",
-            password="testpass123",
-            first_name="Test",
-            last_name="User",
-            phone="1234567890",
-            user_type="gp",
-        )
+        run = self.build_run()
 
-        # Create a patient user
-        patient = User.objects.create_user(
-            email="patient@example.com",
-            password="testpass123",
-            first_name="Test",
-            last_name="Patient",
-            phone="1234567890",
-            user_type="patient",
-        )
+        expected = f"Matching run for {self.referral.referral_id} - Pending"
+        with self.assertNumQueries(0):
+            self.assertEqual(str(run), expected)
 
-        referral = Referral.objects.create(
-            referrer=user,
-            patient=patient,
-            presenting_problem="Test problem",
-            service_type="nhs",
-            modality="in_person",
-            priority="routine",
-        )
+    def test_admin_list_str_single_query(self):
+        """Test the admin changelist renders run referrals without N+1 queries."""
+        for _ in range(3):
+            self.create_run()
+        run_admin = MatchingRunAdmin(MatchingRun, admin.site)
 
-        run = MatchingRun.objects.create(
-            referral=referral,
-            algorithm_name="Test Algorithm",
-            algorithm_version="1.0",
-            total_referrals=100,
-            successful_matches=80,
-            failed_matches=20,
-            average_confidence=0.75,
-            processing_time_seconds=30.5,
-        )
+        with self.assertNumQueries(1):
+            labels = [str(run.referral) for run in run_admin.get_queryset(request=None)]
 
-        expected = f"Matching run for {referral.referral_id} - Pending"
-        self.assertEqual(str(run), expected)
+        self.assertEqual(len(labels), 3)
+        self.assertTrue(all("Test Patient" in label for label in labels))
 
     def test_success_rate_property(self):
-        """Test success rate calculation."""
-        # Create a test referral first
-        from accounts.models import User
-        from referrals.models import Referral
-
-        user = User.objects.create_user(
-            email="test2@example.com",
-            password="testpass123",
-            first_name="Test",
-            last_name="User",
-            phone="1234567890",
-            user_type="gp",
-        )
-
-        # Create a patient user
-        patient = User.objects.create_user(
-            email="patient2@example.com",
-            password="testpass123",
-            first_name="Test",
-            last_name="Patient2",
-            phone="1234567890",
-            user_type="patient",
-        )
-
-        referral = Referral.objects.create(
-            referrer=user,
-            patient=patient,
-            presenting_problem="Test problem 2",
-            service_type="nhs",
-            modality="in_person",
-            priority="routine",
-        )
-
-        run = MatchingRun.objects.create(
-            referral=referral,
-            algorithm_name="Test Algorithm",
-            algorithm_version="1.0",
-            total_referrals=100,
-            successful_matches=80,
-            failed_matches=20,
-            average_confidence=0.75,
-            processing_time_seconds=30.5,
-        )
-
-        expected_success_rate = 80 / 100
-        self.assertEqual(run.success_rate, expected_success_rate)
-
-    def test_success_rate_zero_division(self):
-        """Test success rate with zero total referrals."""
-        # Create a test referral first
-        from accounts.models import User
-        from referrals.models import Referral
-
-        user = User.objects.create_user(
-            email="test3@example.com",
-            password="testpass123",
-            first_name="Test",
-            last_name="User",
-            phone="1234567890",
-            user_type="gp",
-        )
-
-        # Create a patient user
-        patient = User.objects.create_user(
-            email="patient3@example.com",
-            password="testpass123",
-            first_name="Test",
-            last_name="Patient3",
-            phone="1234567890",
-            user_type="patient",
-        )
-
-        referral = Referral.objects.create(
-            referrer=user,
-            patient=patient,
-            presenting_problem="Test problem 3",
-            service_type="nhs",
-            modality="in_person",
-            priority="routine",
-        )
-
-        run = MatchingRun.objects.create(
-            referral=referral,
-            algorithm_name="Test Algorithm",
-            algorithm_version="1.0",
-            total_referrals=0,
-            successful_matches=0,
-            failed_matches=0,
-            average_confidence=0.0,
-            processing_time_seconds=0.0,
-        )
-
-        self.assertEqual(run.success_rate, 0.0)
+        """Test success rate calculation, including zero total referrals."""
+        cases = [
+            ({}, 80 / 100),
+            (
+                {
+                    "total_referrals": 0,
+                    "successful_matches": 0,
+                    "failed_matches": 0,
+                    "average_confidence": 0.0,
+                    "processing_time_seconds": 0.0,
+                },
+                0.0,
+            ),
+        ]
+        for overrides, expected_success_rate in cases:
+            with self.subTest(total_referrals=overrides.get("total_referrals", 100)):
+                run = self.build_run(**overrides)
+
+                with self.assertNumQueries(0):
+                    self.assertEqual(run.success_rate, expected_success_rate)
 
     def test_duration_property(self):
         """Test duration calculation."""
-        # Create a test referral first
-        from accounts.models import User
-        from referrals.models import Referral
-
-        user = User.objects.create_user(
-            email="test4@example.com",
-            password="testpass123",
-            first_name="Test",
-            last_name="User",
-            phone="1234567890",
-            user_type="gp",
-        )
-
-        # Create a patient user
-        patient = User.objects.create_user(
-            email="patient4@example.com",
-            password="testpass123",
-            first_name="Test",
-            last_name="Patient4",
-            phone="1234567890",
-            user_type="patient",
-        )
-
-        referral = Referral.objects.create(
-            referrer=user,
-            patient=patient,
-            presenting_problem="Test problem 4",
-            service_type="nhs",
-            modality="in_person",
-            priority="routine",
+        run = self.build_run(
+            started_at=RUN_STARTED_AT, completed_at=RUN_STARTED_AT + RUN_DURATION
         )
 
-        from datetime import timedelta
-
-        from django.utils import timezone
-
-        started_at = timezone.now()
-        completed_at = started_at + timedelta(seconds=30.5)
-
-        run = MatchingRun.objects.create(
-            referral=referral,
-            algorithm_name="Test Algorithm",
-            algorithm_version="1.0",
-            total_referrals=100,
-            successful_matches=80,
-            failed_matches=20,
-            average_confidence=0.75,
-            processing_time_seconds=30.5,
-            started_at=started_at,
-            completed_at=completed_at,
-        )
-
-        self.assertEqual(run.duration, 30.5)
+        with self.assertNumQueries(0):
+            self.assertEqual(run.duration, 30.5)
 
     def test_metadata_property(self):
-        """Test metadata property."""
-        # Create a test referral first
-        from accounts.models import User
-        from referrals.models import Referral
-
-        user = User.objects.create_user(
-            email="test5@example.com",
-            password="testpass123",
-            first_name="Test",
-            last_name="User",
-            phone="1234567890",
-            user_type="gp",
-        )
-
-        # Create a patient user
-        patient = User.objects.create_user(
-            email="patient5@example.com",
-            password="testpass123",
-            first_name="Test",
-            last_name="Patient5",
-            phone="1234567890",
-            user_type="patient",
-        )
-
-        referral = Referral.objects.create(
-            referrer=user,
-            patient=patient,
-            presenting_problem="Test problem 5",
-            service_type="nhs",
-            modality="in_person",
-            priority="routine",
-        )
-
-        run = MatchingRun.objects.create(
-            referral=referral,
-            algorithm_name="Test Algorithm",
-            algorithm_version="1.0",
-            total_referrals=100,
-            successful_matches=80,
-            failed_matches=20,
-            average_confidence=0.75,
-            processing_time_seconds=30.5,
-            metadata={"test_key": "test_value"},
-        )
-
-        expected_metadata = {"test_key": "test_value"}
-        self.assertEqual(run.metadata, expected_metadata)
-
-    def test_metadata_default(self):
-        """Test metadata default value."""
-        # Create a test referral first
-        from accounts.models import User
-        from referrals.models import Referral
-
-        user = User.objects.create_user(
-            email="test6@example.com",
-            password="testpass123",
-            first_name="Test",
-            last_name="User",
-            phone="1234567890",
-            user_type="gp",
-        )
-
-        # Create a patient user
-        patient = User.objects.create_user(
-            email="patient6@example.com",
-            password="testpass123",
-            first_name="Test",
-            last_name="Patient6",
-            phone="1234567890",
-            user_type="patient",
-        )
-
-        referral = Referral.objects.create(
-            referrer=user,
-            patient=patient,
-            presenting_problem="Test problem 6",
-            service_type="nhs",
-            modality="in_person",
-            priority="routine",
-        )
-
-        run = MatchingRun.objects.create(
-            referral=referral,
-            algorithm_name="Test Algorithm",
-            algorithm_version="1.0",
-            total_referrals=100,
-            successful_matches=80,
-            failed_matches=20,
-            average_confidence=0.75,
-            processing_time_seconds=30.5,
-        )
-
-        self.assertEqual(run.metadata, {})
+        """Test metadata property, including its default."""
+        cases = [
+            ({"metadata": {"test_key": "test_value"}}, {"test_key": "test_value"}),
+            ({}, {}),
+        ]
+        for overrides, expected_metadata in cases:
+            with self.subTest(expected_metadata=expected_metadata):
+                run = self.build_run(**overrides)
+
+                with self.assertNumQueries(0):
+                    self.assertEqual(run.metadata, expected_metadata)
@@ -1,58 +1,172 @@
 """
 Tests for matching services.
 """
-from unittest.mock import Mock, patch
+import itertools
+import json
+import os
+import sys
+import time
+import types
+import unittest
+from unittest.mock import MagicMock, Mock, patch
 
 import numpy as np
+import pytest
+from scipy import sparse
+from sklearn.metrics.pairwise import cosine_similarity
 
 from django.contrib.auth import get_user_model
+from django.contrib.gis.geos import Point
 from django.core.cache import cache
-from django.test import TestCase
+from django.db import connection, transaction
+from django.db.models import F
+from django.test import SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
 
 from catalogue.models import Psychologist
+from matching.models import MatchingThreshold
 from matching.routing_service import ReferralRoutingService
 from matching.services import (
+    _MATCHING_FIELDS,
     BM25Service,
     FeasibilityFilter,
     HybridRetrievalService,
     MatchingService,
     ProbabilityCalibrationService,
     VectorEmbeddingService,
+    _load_sentence_transformer,
 )
 from referrals.models import Referral
 
 User = get_user_model()
 
+# Shared London coordinates; GEOS geometries are safe to share read-only
+LONDON_LAT, LONDON_LON = 51.5074, -0.1278
+LONDON_POINT = Point(LONDON_LON, LONDON_LAT, srid=4326)
+LONDON_LOCATION = {
+    "latitude": LONDON_LAT,
+    "longitude": LONDON_LON,
+    "location": LONDON_POINT,
+}
+
+_psychologist_sequence = itertools.count()
+
+# Neither manage.py test nor the default pytest run deselects slow marks, so
+# the 1000-psychologist scaling and latency tests only run when asked for
+skip_unless_slow = unittest.skipUnless(
+    os.environ.get("RUN_SLOW_TESTS"), "set RUN_SLOW_TESTS=1 to run slow tests"
+)
+
+EMBEDDING_DIMENSION = 384
+
+# Read-only float32 fake embeddings shared by the vector tests
+EMBED3 = np.array([0.1, 0.2, 0.3], dtype=np.float32)
+ORTHO1 = np.array([1, 0, 0], dtype=np.float32)
+ORTHO2 = np.array([0, 1, 0], dtype=np.float32)
+for _embedding in (EMBED3, ORTHO1, ORTHO2):
+    _embedding.setflags(write=False)
+
+
+def _fake_encode(texts, **kwargs) -> np.ndarray:
+    """Return zero embeddings shaped like the real model's output."""
+    if isinstance(texts, str):
+        return np.zeros(EMBEDDING_DIMENSION, dtype=np.float32)
+    return np.zeros((len(texts), EMBEDDING_DIMENSION), dtype=np.float32)
+
+
+# Stand-in for the sentence_transformers package, installed for the whole
+# module so no test imports torch or loads real model weights
+_sentence_transformers_stub = types.ModuleType("sentence_transformers")
+_sentence_transformers_stub.SentenceTransformer = MagicMock()
+_sentence_transformers_stub.SentenceTransformer.return_value.encode.side_effect = (
+    _fake_encode
+)
+_sentence_transformers_patch = patch.dict(
+    sys.modules, {"sentence_transformers": _sentence_transformers_stub}
+)
+
+
+def setUpModule():
+    _sentence_transformers_patch.start()
+    _load_sentence_transformer.cache_clear()
 
-class TestVectorEmbeddingService(TestCase):
+
+def tearDownModule():
+    # Don't leak stub models to other modules through the shared model cache
+    _load_sentence_transformer.cache_clear()
+    _sentence_transformers_patch.stop()
+
+
+def create_psychologists(*overrides: dict) -> list[Psychologist]:
+    """
+    Bulk-create active psychologists (and their users), one per overrides dict.
+
+    Locations are built inline from latitude/longitude so no follow-up
+    update_location() UPDATE is needed. Both inserts run in one atomic block,
+    which is a savepoint inside a test case's own transaction.
+    """
+    with transaction.atomic():
+        users = User.objects.bulk_create(
+            [
+                User(
+                    username=f"psych_{n}@example.com",
+                    email=f"psych_{n}@example.com",
+                    user_type="psychologist",
+                )
+                for n in itertools.islice(_psychologist_sequence, len(overrides))
+            ]
+        )
+
+        psychologists = []
+        for user, fields in zip(users, overrides):
+            fields = {"is_active": True, "is_accepting_referrals": True, **fields}
+            if fields.get("latitude") and fields.get("longitude"):
+                fields.setdefault(
+                    "location",
+                    Point(fields["longitude"], fields["latitude"], srid=4326),
+                )
+            psychologists.append(Psychologist(user=user, **fields))
+
+        return Psychologist.objects.bulk_create(psychologists)
+
+
+class TestVectorEmbeddingService(SimpleTestCase):
     """Test VectorEmbeddingService."""
 
     def setUp(self):
         self.service = VectorEmbeddingService()
         cache.clear()
 
-    def tearDown(self):
-        cache.clear()
-
     @patch("sentence_transformers.SentenceTransformer")
     def test_initialization(self, mock_transformer):
-        """Test service initialization."""
-        mock_model = Mock()
-        mock_transformer.return_value = mock_model
-
+        """Test service initialization loads the model lazily."""
         service = VectorEmbeddingService(model_name="test-model")
 
         self.assertEqual(service.model_name, "test-model")
         self.assertEqual(service.cache_timeout, 3600)
+        self.assertIsNone(service.model)
+        mock_transformer.assert_not_called()
+
+        service.generate_embedding("test text")
+
         mock_transformer.assert_called_once_with("test-model")
 
     @patch("sentence_transformers.SentenceTransformer")
-    def test_generate_embedding_caching(self, mock_transformer):
+    def test_model_shared_between_services(self, mock_transformer):
+        """Test services for the same model share one loaded instance."""
+        first = VectorEmbeddingService(model_name="shared-model")
+        second = VectorEmbeddingService(model_name="shared-model")
+
+        first.generate_embedding("first text")
+        second.generate_embedding("second text")
+
+        mock_transformer.assert_called_once_with("shared-model")
+        self.assertIs(first.model, second.model)
+
+    def test_generate_embedding_caching(self):
         """Test embedding generation with caching."""
         mock_model = Mock()
-        mock_embedding = np.array([0.1, 0.2, 0.3])
-        mock_model.encode.return_value = mock_embedding
-        mock_transformer.return_value = mock_model
+        mock_model.encode.return_value = EMBED3
 
         service = VectorEmbeddingService()
         service.model = mock_model
@@ -70,15 +184,14 @@ class TestVectorEmbeddingService(TestCase):
 
         # Results should be the same
         np.testing.assert_array_equal(result1, result2)
-        np.testing.assert_array_equal(result1, mock_embedding)
+        np.testing.assert_array_equal(result1, EMBED3)
+        self.assertEqual(result1.dtype, np.float32)
 
-    @patch("sentence_transformers.SentenceTransformer")
-    def test_generate_embeddings_batch_caching(self, mock_transformer):
+    def test_generate_embeddings_batch_caching(self):
         """Test batch embedding generation with caching."""
         mock_model = Mock()
         mock_embeddings = np.array([[0.1, 0.2], [0.3, 0.4]])
         mock_model.encode.return_value = mock_embeddings
-        mock_transformer.return_value = mock_model
 
         service = VectorEmbeddingService()
         service.model = mock_model
@@ -91,35 +204,94 @@ class TestVectorEmbeddingService(TestCase):
         # Second call - should use cache
         result2 = service.generate_embeddings_batch(texts)
 
-        # Model should only be called once
-        mock_model.encode.assert_called()
+        # Model should only be called once, for both texts together
+        mock_model.encode.assert_called_once()
+        self.assertEqual(mock_model.encode.call_args.args[0], texts)
 
-        # Results should be the same
+        # Results should be the same, stored as float32 whatever the model gives
         np.testing.assert_array_equal(result1, result2)
+        self.assertEqual(result1.dtype, np.float32)
+        self.assertEqual(result2.dtype, np.float32)
+
+
+class TestVectorSimilarity(SimpleTestCase):
+    """Test VectorEmbeddingService similarity maths without the database."""
+
+    def setUp(self):
+        self.service = VectorEmbeddingService()
 
     def test_calculate_similarity(self):
         """Test similarity calculation."""
-        embedding1 = np.array([1, 0, 0])
-        embedding2 = np.array([0, 1, 0])
-        embedding3 = np.array([1, 0, 0])
-
         # Orthogonal vectors should have similarity 0
-        similarity = self.service.calculate_similarity(embedding1, embedding2)
+        similarity = self.service.calculate_similarity(ORTHO1, ORTHO2)
         self.assertAlmostEqual(similarity, 0.0, places=5)
 
         # Identical vectors should have similarity 1
-        similarity = self.service.calculate_similarity(embedding1, embedding3)
+        similarity = self.service.calculate_similarity(ORTHO1, ORTHO1)
         self.assertAlmostEqual(similarity, 1.0, places=5)
 
+    def test_calculate_similarity_matches_sklearn(self):
+        """Test the NumPy similarity agrees with sklearn's cosine_similarity."""
+        rng = np.random.default_rng(0)
+        pairs = [
+            (
+                rng.standard_normal(EMBEDDING_DIMENSION),
+                rng.standard_normal(EMBEDDING_DIMENSION),
+            )
+            for _ in range(5)
+        ]
+        pairs.append((ORTHO1, np.zeros(3, dtype=np.float32)))
+
+        for embedding1, embedding2 in pairs:
+            with self.subTest(embedding1=embedding1[:3]):
+                expected = cosine_similarity([embedding1], [embedding2])[0][0]
+                self.assertAlmostEqual(
+                    self.service.calculate_similarity(embedding1, embedding2),
+                    expected,
+                    places=6,
+                )
+
+    def test_similarity_batch(self):
+        """Test batched similarity matches the pairwise calculation."""
+        matrix = np.stack([ORTHO2, 2 * ORTHO1, ORTHO1 + ORTHO2])
+
+        similarities = self.service.similarity_batch(ORTHO1, matrix)
+
+        self.assertEqual(similarities.shape, (3,))
+        self.assertEqual(similarities.dtype, np.float32)
+        expected = [self.service.calculate_similarity(ORTHO1, row) for row in matrix]
+        np.testing.assert_allclose(similarities, expected, atol=1e-5)
+
+    def test_similarity_batch_zero_vector(self):
+        """Test a zero embedding scores 0 rather than dividing by zero."""
+        similarities = self.service.similarity_batch(
+            np.array([1.0, 0.0]), np.array([[0.0, 0.0], [1.0, 0.0]])
+        )
+
+        np.testing.assert_allclose(similarities, [0.0, 1.0], atol=1e-6)
+
 
 class TestBM25Service(TestCase):
     """Test BM25Service."""
 
+    @classmethod
+    def setUpTestData(cls):
+        cls.psychologist, cls.other_psychologist = create_psychologists(
+            {
+                "specialisms": ["anxiety", "depression"],
+                "qualifications": ["PhD"],
+                "preferred_conditions": ["anxiety"],
+            },
+            {"specialisms": ["trauma", "ptsd"]},
+        )
+
+        # Fit the index once; tests only read it
+        cls.index = BM25Service()
+        cls.index.build_index(Psychologist.objects.select_related("user"))
+
     def setUp(self):
         self.service = BM25Service()
-        cache.clear()
-
-    def tearDown(self):
+        BM25Service.clear_fitted_indexes()
         cache.clear()
 
     def test_initialization(self):
@@ -131,93 +303,164 @@ class TestBM25Service(TestCase):
 
     def test_build_index_empty(self):
         """Test building index with empty queryset."""
-        from django.db.models import QuerySet
-
-        empty_qs = QuerySet(Psychologist)
-
-        result = self.service.build_index(empty_qs)
+        # none() never hits the database, unlike a bare QuerySet(Psychologist)
+        # which would evaluate to every psychologist in the class corpus
+        with self.assertNumQueries(0):
+            result = self.service.build_index(Psychologist.objects.none())
 
         self.assertFalse(result)
         self.assertIsNone(self.service.vectorizer)
 
-    @patch("matching.services.TfidfVectorizer")
-    def test_build_index_success(self, mock_vectorizer):
+    def test_build_index_success(self):
         """Test successful index building."""
-        # Create mock psychologist
-        user = User.objects.create_user(
-            username="test_psych",
-            email="test@example.com",
-            first_name="Test",
-            last_name="Psychologist",
-        )
-        psychologist = Psychologist.objects.create(
-            user=user,
-            specialisms=["anxiety", "depression"],
-            qualifications=["PhD"],
-            preferred_conditions=["anxiety"],
+        self.assertIsNotNone(self.index.vectorizer)
+        self.assertEqual(self.index.document_vectors.shape[0], 2)
+
+        self.assertTrue(sparse.isspmatrix_csr(self.index.document_vectors))
+        self.assertEqual(self.index.document_vectors.dtype, np.float32)
+        self.assertCountEqual(
+            self.index.document_ids,
+            [self.psychologist.id, self.other_psychologist.id],
         )
 
-        mock_vectorizer_instance = Mock()
-        mock_vectorizer.return_value = mock_vectorizer_instance
-        mock_vectorizer_instance.fit_transform.return_value = np.array([[1, 2], [3, 4]])
+    def test_build_index_reuses_fitted_corpus(self):
+        """Test rebuilding over an unchanged corpus skips re-fitting."""
+        fitted = BM25Service()
+        fitted.build_index(Psychologist.objects.select_related("user"))
 
-        result = self.service.build_index(
-            Psychologist.objects.filter(id=psychologist.id)
-        )
+        with patch("matching.services.CountVectorizer") as mock_vectorizer:
+            result = self.service.build_index(
+                Psychologist.objects.select_related("user")
+            )
 
         self.assertTrue(result)
-        self.assertEqual(len(self.service.document_ids), 1)
-        self.assertEqual(self.service.document_ids[0], psychologist.id)
+        mock_vectorizer.assert_not_called()
+        self.assertEqual(self.service.index_version, fitted.index_version)
+        self.assertIs(self.service.vectorizer, fitted.vectorizer)
+        self.assertEqual(
+            self.service.search("anxiety", top_k=1)[0][0], self.psychologist.id
+        )
+
+    def test_clear_fitted_indexes_forces_refit(self):
+        """Test clearing the shared memo makes the next build fit again."""
+        fitted = BM25Service()
+        fitted.build_index(Psychologist.objects.select_related("user"))
+
+        BM25Service.clear_fitted_indexes()
+        self.service.build_index(Psychologist.objects.select_related("user"))
+
+        self.assertIsNot(self.service.vectorizer, fitted.vectorizer)
 
     def test_search_no_index(self):
         """Test search without built index."""
         result = self.service.search("test query")
         self.assertEqual(result, [])
 
-    @patch("matching.services.TfidfVectorizer")
-    def test_search_caching(self, mock_vectorizer):
+    def test_search_caching(self):
         """Test search with caching."""
-        # Build index
-        user = User.objects.create_user(
-            username="test_psych",
-            email="test@example.com",
-            first_name="Test",
-            last_name="Psychologist",
-        )
-        psychologist = Psychologist.objects.create(
-            user=user, specialisms=["anxiety", "depression"]
-        )
-
-        mock_vectorizer_instance = Mock()
-        mock_vectorizer.return_value = mock_vectorizer_instance
-        mock_vectorizer_instance.fit_transform.return_value = np.array([[1, 2]])
-        mock_vectorizer_instance.transform.return_value = np.array([[0.5, 1.0]])
-
-        self.service.build_index(Psychologist.objects.filter(id=psychologist.id))
-
         query = "anxiety therapy"
 
-        # First search
-        result1 = self.service.search(query, top_k=1)
+        with patch.object(
+            self.index.vectorizer, "transform", wraps=self.index.vectorizer.transform
+        ) as mock_transform:
+            # First search
+            result1 = self.index.search(query, top_k=1)
+
+            # Second search - should use cache
+            result2 = self.index.search(query, top_k=1)
 
-        # Second search - should use cache
-        result2 = self.service.search(query, top_k=1)
+        self.assertEqual(mock_transform.call_count, 1)
 
-        # Vectorizer should only be called once for transform
-        self.assertGreaterEqual(mock_vectorizer_instance.transform.call_count, 1)
+        self.assertEqual(result1[0][0], self.psychologist.id)
 
         # Results should be the same
         self.assertEqual(result1, result2)
 
-
-class TestHybridRetrievalService(TestCase):
-    """Test HybridRetrievalService."""
+    def test_search_top_k_ordered(self):
+        """Test top-k selection matches a full sort over a larger corpus."""
+        terms = ["anxiety", "depression", "trauma", "ptsd", "ocd", "grief"]
+        rng = np.random.default_rng(0)
+        # build_index only reads attributes, so the corpus is never saved
+        psychologists = [
+            Psychologist(
+                user=User(first_name=f"First{i}", last_name=f"Last{i}"),
+                specialisms=list(rng.choice(terms, size=3)),
+            )
+            for i in range(1000)
+        ]
+        service = BM25Service()
+        service.build_index(psychologists)
+
+        results = service.search("anxiety trauma grief", top_k=10)
+
+        scores = [score for _, score in results]
+        self.assertEqual(len(scores), 10)
+        self.assertEqual(scores, sorted(scores, reverse=True))
+        all_scores = sorted(
+            (score for _, score in service.search("anxiety trauma grief", 1000)),
+            reverse=True,
+        )
+        self.assertEqual(scores, all_scores[:10])
+
+    def test_search_full_match_scores_one(self):
+        """Test a document holding every query term once scores about 1."""
+        specialisms = [
+            ["anxiety", "trauma"],
+            ["grief", "ocd"],
+            ["depression", "ptsd"],
+            ["stress", "insomnia"],
+        ]
+        # Equal-length documents, so none is penalised for its length
+        psychologists = [
+            Psychologist(user=User(), specialisms=terms) for terms in specialisms
+        ]
+        service = BM25Service()
+        service.build_index(psychologists)
+
+        results = service.search("anxiety trauma", top_k=4)
+
+        self.assertEqual(len(results), 1)
+        self.assertAlmostEqual(results[0][1], 1.0, places=5)
+
+    def test_search_strong_matches_do_not_tie(self):
+        """Test documents scoring past a full match keep their order."""
+        specialisms = [
+            ["anxiety", "anxiety", "anxiety"],
+            ["anxiety", "depression", "ptsd"],
+            ["grief", "ocd", "stress"],
+            ["trauma", "insomnia", "phobia"],
+        ]
+        psychologists = [
+            Psychologist(user=User(), specialisms=terms) for terms in specialisms
+        ]
+        service = BM25Service()
+        service.build_index(psychologists)
+
+        results = service.search("anxiety", top_k=4)
+
+        self.assertEqual(len(results), 2)
+        (_, repeated_score), (_, single_score) = results
+        self.assertAlmostEqual(repeated_score, 1.0, places=5)
+        self.assertGreater(repeated_score, single_score)
+
+    def test_search_scores_bounded(self):
+        """Test BM25 scores are scaled into 0-1 for the hybrid weighting."""
+        results = self.index.search("anxiety anxiety depression trauma", top_k=2)
+
+        self.assertEqual(len(results), 2)
+        for psychologist_id, score in results:
+            with self.subTest(psychologist_id=psychologist_id):
+                self.assertGreater(score, 0.0)
+                self.assertLessEqual(score, 1.0)
+
+
+class TestHybridRetrievalService(SimpleTestCase):
+    """Test HybridRetrievalService with in-memory psychologists and services."""
 
     def setUp(self):
         self.service = HybridRetrievalService(vector_weight=0.7, bm25_weight=0.3)
-        cache.clear()
-
-    def tearDown(self):
+        self.service.vector_service = Mock()
+        self.service.bm25_service = Mock()
         cache.clear()
 
     def test_initialization(self):
@@ -225,130 +468,408 @@ class TestHybridRetrievalService(TestCase):
         self.assertEqual(self.service.vector_weight, 0.7)
         self.assertEqual(self.service.bm25_weight, 0.3)
 
-    @patch("matching.services.VectorEmbeddingService")
-    @patch("matching.services.BM25Service")
-    def test_search_hybrid(self, mock_bm25, mock_vector):
+    def test_search_hybrid(self):
         """Test hybrid search."""
-        # Create mock psychologist
-        user = User.objects.create_user(
-            username="test_psych",
-            email="test@example.com",
-            first_name="Test",
-            last_name="Psychologist",
+        # The search only reads attributes, so the psychologist is never saved
+        psychologist = Psychologist(
+            specialisms=["anxiety"], embedding=json.dumps(EMBED3.tolist())
+        )
+
+        self.service.bm25_service.build_index.return_value = True
+        self.service.bm25_service.search.return_value = [(psychologist.id, 0.8)]
+        self.service.vector_service.generate_embedding.return_value = EMBED3
+        self.service.vector_service.similarity_batch.return_value = np.array(
+            [0.9], dtype=np.float32
         )
-        psychologist = Psychologist.objects.create(user=user, specialisms=["anxiety"])
 
-        # Mock services
-        mock_vector_instance = Mock()
-        mock_vector.return_value = mock_vector_instance
-        mock_vector_instance.generate_embedding.return_value = np.array([0.1, 0.2])
+        result = self.service.search("anxiety therapy", [psychologist], top_k=1)
 
-        mock_bm25_instance = Mock()
-        mock_bm25.return_value = mock_bm25_instance
-        mock_bm25_instance.search.return_value = [(str(psychologist.id), 0.8)]
+        self.assertEqual(len(result), 1)
+        self.assertIs(result[0]["psychologist"], psychologist)
+        self.assertAlmostEqual(result[0]["score"], 0.7 * 0.9 + 0.3 * 0.8, places=6)
+        self.assertAlmostEqual(result[0]["vector_score"], 0.9, places=6)
+        self.assertEqual(result[0]["bm25_score"], 0.8)
+
+        # Candidates must be scored in one batched call, not pair by pair
+        self.service.vector_service.similarity_batch.assert_called_once()
+        self.service.vector_service.calculate_similarity.assert_not_called()
+
+    def test_embedding_matrix(self):
+        """Test stored embeddings stack into a float32 matrix, decoded once each."""
+        psychologists = [
+            Psychologist(embedding=json.dumps(embedding.tolist()))
+            for embedding in (EMBED3, ORTHO1)
+        ]
+        psychologists.append(Psychologist())  # No embedding, so left out
+
+        embedded, matrix = self.service._embedding_matrix(psychologists, 3)
+
+        self.assertEqual(embedded, psychologists[:2])
+        self.assertEqual(matrix.dtype, np.float32)
+        self.assertTrue(matrix.flags["C_CONTIGUOUS"])
+        np.testing.assert_array_equal(matrix, np.stack([EMBED3, ORTHO1]))
+
+        # Unchanged embeddings come from the memo rather than being re-parsed
+        with patch("matching.services.json.loads") as mock_loads:
+            _, matrix_again = self.service._embedding_matrix(psychologists, 3)
+
+        mock_loads.assert_not_called()
+        np.testing.assert_array_equal(matrix_again, matrix)
+
+    def test_embedding_matrix_skips_wrong_dimension(self):
+        """Test one wrong-length embedding is skipped rather than failing all."""
+        stale = Psychologist(embedding=json.dumps([0.5, 0.5]))
+        psychologists = [
+            Psychologist(embedding=json.dumps(EMBED3.tolist())),
+            stale,
+            Psychologist(embedding=json.dumps(ORTHO1.tolist())),
+        ]
+
+        with self.assertLogs("matching.services", level="WARNING"):
+            embedded, matrix = self.service._embedding_matrix(psychologists, 3)
+
+        self.assertNotIn(stale, embedded)
+        self.assertEqual(len(embedded), 2)
+        np.testing.assert_array_equal(matrix, np.stack([EMBED3, ORTHO1]))
+
+    def test_search_rrf(self):
+        """Test rank fusion puts a result found by both retrievers first."""
+        service = HybridRetrievalService(fusion="rrf")
+        service.vector_service = Mock()
+        service.bm25_service = Mock()
+        both, vector_only = (
+            Psychologist(embedding=json.dumps(embedding.tolist()))
+            for embedding in (EMBED3, ORTHO1)
+        )
+        bm25_only = Psychologist()  # No embedding, so never vector-ranked
+
+        service.bm25_service.build_index.return_value = True
+        service.bm25_service.search.return_value = [
+            (bm25_only.id, 0.9),
+            (both.id, 0.5),
+        ]
+        service.vector_service.generate_embedding.return_value = EMBED3
+        service.vector_service.similarity_batch.return_value = np.array(
+            [0.6, 0.8], dtype=np.float32
+        )
 
-        # Mock psychologist methods
-        psychologist.get_embedding = Mock(return_value=np.array([0.1, 0.2]))
+        result = service.search(
+            "anxiety therapy", [both, vector_only, bm25_only], top_k=3
+        )
 
-        result = self.service.search(
-            "anxiety therapy", Psychologist.objects.filter(id=psychologist.id), top_k=1
+        # Second in both rankings beats first in only one; scores are rescaled
+        # so first in both would be 1
+        self.assertIs(result[0]["psychologist"], both)
+        self.assertAlmostEqual(result[0]["score"], 61 / 62, places=6)
+        self.assertAlmostEqual(result[1]["score"], 0.5, places=6)
+        self.assertCountEqual(
+            [match["psychologist"] for match in result[1:]], [vector_only, bm25_only]
         )
+        self.assertEqual(result[0]["explanation"]["fusion"], "rrf")
 
-        self.assertEqual(len(result), 1)
-        self.assertEqual(result[0]["psychologist"], psychologist)
-        self.assertIn("score", result[0])
-        self.assertIn("vector_score", result[0])
-        self.assertIn("bm25_score", result[0])
+    def test_unknown_fusion_rejected(self):
+        """Test unknown fusion methods fail loudly instead of falling back."""
+        for fusion in ("RRF", "cc", ""):
+            with self.subTest(fusion=fusion), self.assertRaises(ValueError):
+                HybridRetrievalService(fusion=fusion)
+
+
+@skip_unless_slow
+class TestHybridSearchScaling(TestCase):
+    """Coarse latency guard for hybrid search over a realistic catalogue size."""
+
+    CATALOGUE_SIZE = 1000
+    SPECIALISMS = ["anxiety", "depression", "trauma", "ptsd", "ocd", "eating"]
+
+    @classmethod
+    def setUpTestData(cls):
+        rng = np.random.default_rng(0)
+        embeddings = rng.standard_normal(
+            (cls.CATALOGUE_SIZE, EMBEDDING_DIMENSION), dtype=np.float32
+        )
+        create_psychologists(
+            *[
+                {
+                    "specialisms": [
+                        cls.SPECIALISMS[n % len(cls.SPECIALISMS)],
+                        cls.SPECIALISMS[(n * 7) % len(cls.SPECIALISMS)],
+                    ],
+                    "embedding": json.dumps(embedding.tolist()),
+                }
+                for n, embedding in enumerate(embeddings)
+            ]
+        )
+        cls.query_embedding = rng.standard_normal(EMBEDDING_DIMENSION)
+
+    @pytest.mark.slow
+    def test_hybrid_search_latency(self):
+        """Test hybrid search over 1000 psychologists stays within budget."""
+        service = HybridRetrievalService()
+        psychologists = list(Psychologist.objects.select_related("user"))
+        timings = []
+
+        with patch.object(
+            service.vector_service,
+            "generate_embedding",
+            return_value=self.query_embedding,
+        ):
+            for _ in range(5):
+                cache.clear()
+                start = time.perf_counter()
+                results = service.search("anxiety trauma", psychologists, top_k=10)
+                timings.append(time.perf_counter() - start)
+
+        self.assertEqual(len(results), 10)
+        # Generous enough for slow CI runners, but a per-candidate Python
+        # loop over sklearn calls would blow straight through it
+        self.assertLess(float(np.median(timings)), 1.0)
+
+
+# Shared feasibility corpus: each psychologist fails at most one criterion
+# for an NHS/remote referral made from London. Only one row carries a
+# location; the radius filter keeps unlocated psychologists, so the rest
+# skip geometry writes entirely.
+FEASIBILITY_CORPUS = {
+    "nhs_remote": {
+        "service_type": "nhs",
+        "modality": "remote",
+        "specialisms": ["anxiety", "depression"],
+        **LONDON_LOCATION,
+    },
+    "private_in_person": {"service_type": "private", "modality": "in_person"},
+    "mixed": {"service_type": "mixed", "modality": "mixed"},
+    "unavailable": {
+        "service_type": "nhs",
+        "modality": "remote",
+        "availability_status": "unavailable",
+    },
+    "at_capacity": {
+        "service_type": "nhs",
+        "modality": "remote",
+        "max_patients": 10,
+        "current_patients": 10,
+    },
+}
+ALL_NAMES = set(FEASIBILITY_CORPUS)
+
+REFERRAL_FIELDS = {
+    "presenting_problem": "Anxiety and depression",
+    "service_type": Referral.ServiceType.NHS,
+    "modality": Referral.Modality.REMOTE,
+    "preferred_latitude": LONDON_LAT,
+    "preferred_longitude": LONDON_LON,
+    "max_distance_km": 50,
+    "required_specialisms": ["anxiety", "depression"],
+}
 
 
 class TestFeasibilityFilter(TestCase):
     """Test FeasibilityFilter."""
 
+    @classmethod
+    def setUpTestData(cls):
+        psychologists = create_psychologists(*FEASIBILITY_CORPUS.values())
+        cls.names = {
+            psychologist.id: name
+            for psychologist, name in zip(psychologists, FEASIBILITY_CORPUS)
+        }
+
     def setUp(self):
         self.filter = FeasibilityFilter()
 
-        # Create test users
-        self.gp_user = User.objects.create_user(
-            username="gp_user", email="gp@example.com", user_type="gp"
-        )
-        self.patient_user = User.objects.create_user(
-            username="patient_user", email="patient@example.com", user_type="patient"
-        )
+        # The filter only reads referral fields, so it never needs saving
+        self.referral = Referral(**REFERRAL_FIELDS)
 
-        # Create test referral
-        self.referral = Referral.objects.create(
-            referrer=self.gp_user,
-            patient=self.patient_user,
-            presenting_problem="Anxiety and depression",
-            service_type=Referral.ServiceType.NHS,
-            modality=Referral.Modality.REMOTE,
-            preferred_latitude=51.5074,
-            preferred_longitude=-0.1278,
-            max_distance_km=50,
-            required_specialisms=["anxiety", "depression"],
-        )
+        # Base queryset for calling individual steps, with users joined in
+        self.psychologists = Psychologist.objects.select_related("user")
+
+    def names_of(self, psychologists) -> set[str]:
+        """Map filtered psychologists back to their corpus names."""
+        return {self.names[psychologist.id] for psychologist in psychologists}
+
+    def test_inline_location_matches_update_location(self):
+        """Test bulk-created locations equal what update_location() stores."""
+        psychologist = Psychologist.objects.get(pk=next(iter(self.names)))
+        stored_location = psychologist.location
+
+        psychologist.update_location()
+        psychologist.refresh_from_db(fields=["location"])
+
+        self.assertEqual(psychologist.location, stored_location)
+        self.assertEqual(psychologist.location.srid, 4326)
 
     def test_filter_psychologists_basic(self):
-        """Test basic filtering."""
-        # Create test psychologist
-        psych_user = User.objects.create_user(
-            username="psych_user", email="psych@example.com", user_type="psychologist"
+        """Test the full filter keeps only psychologists passing every step."""
+        results = list(self.filter.filter_psychologists(self.referral))
+
+        self.assertEqual(self.names_of(results), {"nhs_remote", "mixed"})
+
+    def test_filter_steps(self):
+        """Test each filter step keeps the expected psychologists in one query."""
+        cases = [
+            ("_filter_by_service_type", {}, ALL_NAMES - {"private_in_person"}),
+            (
+                "_filter_by_service_type",
+                {"service_type": Referral.ServiceType.PRIVATE},
+                {"private_in_person", "mixed"},
+            ),
+            ("_filter_by_modality", {}, ALL_NAMES - {"private_in_person"}),
+            (
+                "_filter_by_modality",
+                {"modality": Referral.Modality.IN_PERSON},
+                {"private_in_person", "mixed"},
+            ),
+            (
+                "_filter_by_modality",
+                {"modality": Referral.Modality.MIXED},
+                ALL_NAMES,
+            ),
+            ("_filter_by_availability", {}, ALL_NAMES - {"unavailable"}),
+            ("_filter_by_radius", {}, ALL_NAMES),
+            ("_filter_by_capacity", {}, ALL_NAMES - {"at_capacity"}),
+        ]
+        for filter_name, referral_fields, expected in cases:
+            with self.subTest(filter_name=filter_name, **referral_fields):
+                referral = Referral(**{**REFERRAL_FIELDS, **referral_fields})
+                filtered = getattr(self.filter, filter_name)(
+                    self.psychologists, referral
+                )
+
+                with self.assertNumQueries(1):
+                    results = list(filtered)
+
+                self.assertEqual(self.names_of(results), expected)
+
+    def test_filter_by_radius_uses_dwithin(self):
+        """Test radius filtering emits an index-eligible ST_DWithin predicate."""
+        filtered = self.filter._filter_by_radius(self.psychologists, self.referral)
+
+        with CaptureQueriesContext(connection) as context:
+            results = list(filtered)
+
+        self.assertEqual(len(results), len(FEASIBILITY_CORPUS))
+        self.assertEqual(len(context.captured_queries), 1)
+        sql = context.captured_queries[0]["sql"].upper()
+        self.assertIn("ST_DWITHIN", sql)
+        self.assertNotIn("ST_DISTANCE", sql)
+
+    def test_filter_psychologists_single_query(self):
+        """Test the filtered queryset loads psychologists and users in one query."""
+        # Enough feasible rows that any per-row query would blow the budget
+        create_psychologists(
+            *[{"service_type": "nhs", "modality": "remote", **LONDON_LOCATION}] * 50
         )
-        psychologist = Psychologist.objects.create(
-            user=psych_user,
-            specialisms=["anxiety", "depression"],
-            service_type="nhs",
-            modality="remote",
-            is_active=True,
-            is_accepting_referrals=True,
+
+        filtered = self.filter.filter_psychologists(self.referral)
+
+        with self.assertNumQueries(1):
+            results = list(filtered)
+            emails = [psychologist.user.email for psychologist in results]
+
+        self.assertEqual(len(emails), 52)
+
+    def test_filter_psychologists_loads_matching_fields_only(self):
+        """Test the default queryset selects just the fields matching reads."""
+        results = list(self.filter.filter_psychologists(self.referral))
+
+        # Reading every matching field costs nothing; the rest is deferred
+        with self.assertNumQueries(0):
+            for psychologist in results:
+                for field in _MATCHING_FIELDS:
+                    getattr(psychologist, field)
+        self.assertIn("location", results[0].get_deferred_fields())
+        self.assertIn("address_line_1", results[0].get_deferred_fields())
+
+    @skip_unless_slow
+    @pytest.mark.slow
+    def test_filter_scales_linearly(self):
+        """Test filtering 1000 psychologists stays a bounded number of queries."""
+        create_psychologists(
+            *[{"service_type": "nhs", "modality": "remote", **LONDON_LOCATION}] * 1000
         )
 
-        result = self.filter.filter_psychologists(self.referral)
+        with CaptureQueriesContext(connection) as context:
+            results = list(self.filter.filter_psychologists(self.referral))
 
-        self.assertEqual(result.count(), 1)
-        self.assertEqual(result.first(), psychologist)
+        # The 1000 new psychologists plus the two feasible corpus members
+        self.assertEqual(len(results), 1002)
+        self.assertLessEqual({p.service_type for p in results}, {"nhs", "mixed"})
+        self.assertLessEqual({p.modality for p in results}, {"remote", "mixed"})
+        self.assertLessEqual(len(context.captured_queries), 3)
+
+
+class TestFeasibilityFilterSteps(SimpleTestCase):
+    """Test the individual FeasibilityFilter steps without touching the database."""
+
+    def setUp(self):
+        self.filter = FeasibilityFilter()
+        self.psychologists = Mock()
 
     def test_filter_by_service_type(self):
-        """Test filtering by service type."""
-        # Create NHS psychologist
-        nhs_user = User.objects.create_user(
-            username="nhs_psych", email="nhs@example.com", user_type="psychologist"
+        """Test service type maps to the accepted psychologist service types."""
+        cases = [
+            ("nhs", ["nhs", "mixed"]),
+            ("private", ["private", "mixed"]),
+        ]
+        for service_type, allowed in cases:
+            with self.subTest(service_type=service_type):
+                self.psychologists.reset_mock()
+                referral = Referral(service_type=service_type)
+
+                self.filter._filter_by_service_type(self.psychologists, referral)
+
+                self.psychologists.filter.assert_called_once_with(
+                    service_type__in=allowed
+                )
+
+    def test_filter_by_modality(self):
+        """Test modality maps to the accepted psychologist modalities."""
+        cases = [
+            ("remote", ["remote", "mixed"]),
+            ("in_person", ["in_person", "mixed"]),
+        ]
+        for modality, allowed in cases:
+            with self.subTest(modality=modality):
+                self.psychologists.reset_mock()
+                referral = Referral(modality=modality)
+
+                self.filter._filter_by_modality(self.psychologists, referral)
+
+                self.psychologists.filter.assert_called_once_with(modality__in=allowed)
+
+    def test_mixed_preferences_do_not_filter(self):
+        """Test mixed service type and modality accept every psychologist."""
+        referral = Referral(service_type="mixed", modality="mixed")
+
+        self.assertIs(
+            self.filter._filter_by_service_type(self.psychologists, referral),
+            self.psychologists,
         )
-        nhs_psych = Psychologist.objects.create(
-            user=nhs_user,
-            service_type="nhs",
-            is_active=True,
-            is_accepting_referrals=True,
+        self.assertIs(
+            self.filter._filter_by_modality(self.psychologists, referral),
+            self.psychologists,
         )
+        self.psychologists.filter.assert_not_called()
 
-        # Create private psychologist
-        private_user = User.objects.create_user(
-            username="private_psych",
-            email="private@example.com",
-            user_type="psychologist",
-        )
-        private_psych = Psychologist.objects.create(
-            user=private_user,
-            service_type="private",
-            is_active=True,
-            is_accepting_referrals=True,
-        )
+    def test_filter_by_radius_without_location(self):
+        """Test radius filtering is skipped when the referral has no location."""
+        referral = Referral(preferred_latitude=None, preferred_longitude=None)
+
+        result = self.filter._filter_by_radius(self.psychologists, referral)
 
-        # Test NHS referral
-        result = self.filter.filter_psychologists(self.referral)
-        self.assertEqual(result.count(), 1)
-        self.assertEqual(result.first(), nhs_psych)
+        self.assertIs(result, self.psychologists)
+        self.psychologists.filter.assert_not_called()
 
-        # Test private referral
-        self.referral.service_type = Referral.ServiceType.PRIVATE
-        self.referral.save()
+    def test_filter_by_capacity(self):
+        """Test capacity compares current against maximum patients."""
+        self.filter._filter_by_capacity(self.psychologists, Referral())
 
-        result = self.filter.filter_psychologists(self.referral)
-        self.assertEqual(result.count(), 1)
-        self.assertEqual(result.first(), private_psych)
+        self.psychologists.filter.assert_called_once_with(
+            current_patients__lt=F("max_patients")
+        )
 
 
-class TestProbabilityCalibrationService(TestCase):
+class TestProbabilityCalibrationService(SimpleTestCase):
     """Test ProbabilityCalibrationService."""
 
     def setUp(self):
@@ -402,33 +923,56 @@ class TestProbabilityCalibrationService(TestCase):
         self.assertTrue(np.all(result >= 0))
         self.assertTrue(np.all(result <= 1))
 
+    def test_calibrate_scores_matches_sklearn(self):
+        """Test the direct curve evaluation agrees with the sklearn calibrators."""
+        scores = np.array([0.1, 0.3, 0.5, 0.7, 0.9])
+        labels = np.array([0, 0, 1, 1, 1])
+        # Include scores outside the fitted range to cover clipping
+        batch = np.random.default_rng(0).uniform(-0.5, 1.5, 100_000)
+
+        for calibration_type in ("isotonic", "platt"):
+            with self.subTest(calibration_type=calibration_type):
+                service = ProbabilityCalibrationService(calibration_type)
+                service.fit(scores, labels)
+
+                if calibration_type == "isotonic":
+                    expected = service.calibrator.transform(batch)
+                else:
+                    expected = service.calibrator.predict_proba(batch.reshape(-1, 1))[
+                        :, 1
+                    ]
+
+                np.testing.assert_allclose(
+                    service.calibrate_scores(batch), expected, atol=1e-12
+                )
+
 
 class TestMatchingService(TestCase):
     """Test MatchingService."""
 
-    def setUp(self):
-        self.service = MatchingService()
-        cache.clear()
-
-        # Create test users
-        self.gp_user = User.objects.create_user(
+    @classmethod
+    def setUpTestData(cls):
+        # Create test users; with no password, create_user stores an unusable
+        # one and skips password hashing entirely
+        cls.gp_user = User.objects.create_user(
             username="gp_user", email="gp@example.com", user_type="gp"
         )
-        self.patient_user = User.objects.create_user(
+        cls.patient_user = User.objects.create_user(
             username="patient_user", email="patient@example.com", user_type="patient"
         )
 
         # Create test referral
-        self.referral = Referral.objects.create(
-            referrer=self.gp_user,
-            patient=self.patient_user,
+        cls.referral = Referral.objects.create(
+            referrer=cls.gp_user,
+            patient=cls.patient_user,
             presenting_problem="Anxiety and depression",
             service_type=Referral.ServiceType.NHS,
             modality=Referral.Modality.REMOTE,
             required_specialisms=["anxiety", "depression"],
         )
 
-    def tearDown(self):
+    def setUp(self):
+        self.service = MatchingService()
         cache.clear()
 
     def test_initialization(self):
@@ -446,6 +990,79 @@ class TestMatchingService(TestCase):
         self.assertIn("anxiety", query)
         self.assertIn("depression", query)
 
+    def test_basic_matching_unsaved_psychologists(self):
+        """Test basic matching scores and ranks in-memory psychologists."""
+        experienced = Psychologist(
+            specialisms=["anxiety", "depression"], years_experience=12
+        )
+        junior = Psychologist(specialisms=["anxiety"], years_experience=3)
+
+        with self.assertNumQueries(0):
+            matches = self.service._basic_matching(
+                self.referral, [junior, experienced], limit=10
+            )
+
+        self.assertEqual(
+            [match["psychologist"] for match in matches], [experienced, junior]
+        )
+        self.assertAlmostEqual(matches[0]["score"], 1.0)
+        self.assertAlmostEqual(matches[1]["score"], (0.5 * 0.4 + 0.6 * 0.2) / 0.6)
+
+    def test_find_matches_no_feasible_psychologists(self):
+        """Test matching stops early, without queries, when nobody is feasible."""
+        referral = Referral(
+            referrer=self.gp_user, patient=self.patient_user, max_distance_km=1
+        )
+
+        with patch.object(
+            self.service.feasibility_filter,
+            "filter_psychologists",
+            return_value=Psychologist.objects.none(),
+        ):
+            with self.assertNumQueries(0):
+                matches = self.service.find_matches(referral)
+
+        self.assertEqual(matches, [])
+
+    def test_find_matches_query_count_is_constant(self):
+        """Test find_matches issues the same number of queries for 1 or 20 psychologists."""
+        psychologist_fields = {
+            "specialisms": ["anxiety", "depression"],
+            "service_type": "nhs",
+            "modality": "remote",
+        }
+        create_psychologists(psychologist_fields)
+
+        with CaptureQueriesContext(connection) as baseline:
+            matches, _ = self.service.find_matches(self.referral, use_hybrid=False)
+            [match["psychologist"].user.email for match in matches]
+        self.assertEqual(len(matches), 1)
+
+        create_psychologists(*[psychologist_fields] * 19)
+        cache.clear()
+
+        with self.assertNumQueries(len(baseline.captured_queries)):
+            matches, _ = self.service.find_matches(self.referral, use_hybrid=False)
+            [match["psychologist"].user.email for match in matches]
+        self.assertEqual(len(matches), 10)
+
+    def test_calculate_specialism_score(self):
+        """Test specialism score is the fraction of required specialisms covered."""
+        psychologist = Psychologist(specialisms=["anxiety"])
+        self.assertAlmostEqual(
+            self.service._calculate_specialism_score(psychologist, self.referral), 0.5
+        )
+
+        psychologist.specialisms = ["anxiety", "depression"]
+        self.assertAlmostEqual(
+            self.service._calculate_specialism_score(psychologist, self.referral), 1.0
+        )
+
+        psychologist.specialisms = []
+        self.assertEqual(
+            self.service._calculate_specialism_score(psychologist, self.referral), 0.0
+        )
+
     def test_get_user_type_for_referrer(self):
         """Test user type determination."""
         # Test with role attribute
@@ -467,26 +1084,27 @@ class TestMatchingService(TestCase):
 class TestReferralRoutingService(TestCase):
     """Test ReferralRoutingService."""
 
-    def setUp(self):
-        self.service = ReferralRoutingService()
-        cache.clear()
-
-        # Create test users
-        self.gp_user = User.objects.create_user(
+    @classmethod
+    def setUpTestData(cls):
+        # Create test users; with no password, create_user stores an unusable
+        # one and skips password hashing entirely
+        cls.gp_user = User.objects.create_user(
             username="gp_user", email="gp@example.com", user_type="gp"
         )
-        self.patient_user = User.objects.create_user(
+        cls.patient_user = User.objects.create_user(
             username="patient_user", email="patient@example.com", user_type="patient"
         )
 
-        # Create test referral
-        self.referral = Referral.objects.create(
-            referrer=self.gp_user,
-            patient=self.patient_user,
+        # Create test referral; each test gets its own copy and routing
+        # updates are rolled back between tests
+        cls.referral = Referral.objects.create(
+            referrer=cls.gp_user,
+            patient=cls.patient_user,
             presenting_problem="Test problem",
         )
 
-    def tearDown(self):
+    def setUp(self):
+        self.service = ReferralRoutingService()
         cache.clear()
 
     def test_route_referral_auto(self):
@@ -525,6 +1143,61 @@ class TestReferralRoutingService(TestCase):
         self.referral.refresh_from_db()
         self.assertEqual(self.referral.status, Referral.Status.MATCHING)
 
+    def test_route_referrals_bulk(self):
+        """Test bulk routing writes every referral in a single query."""
+        referrals = [self.referral] + [
+            Referral.objects.create(
+                referrer=self.gp_user,
+                patient=self.patient_user,
+                presenting_problem=f"Problem {i}",
+            )
+            for i in range(5)
+        ]
+        decisions = ["auto", "high_touch", "manual_review"] * 2
+        expected_statuses = {
+            "auto": Referral.Status.SHORTLISTED,
+            "high_touch": Referral.Status.HIGH_TOUCH_QUEUE,
+            "manual_review": Referral.Status.MATCHING,
+        }
+
+        with self.assertNumQueries(1):
+            result = self.service.route_referrals_bulk(
+                [
+                    (referral, {"decision": decision})
+                    for referral, decision in zip(referrals, decisions)
+                ]
+            )
+
+        self.assertTrue(result)
+        statuses = dict(
+            Referral.objects.filter(
+                pk__in=[referral.pk for referral in referrals]
+            ).values_list("pk", "status")
+        )
+        for referral, decision in zip(referrals, decisions):
+            with self.subTest(decision=decision):
+                self.assertEqual(statuses[referral.pk], expected_statuses[decision])
+
+    def test_get_routing_statistics_cached(self):
+        """Test statistics are cached until a referral changes."""
+        with self.assertNumQueries(1):
+            stats = self.service.get_routing_statistics()
+        with self.assertNumQueries(0):
+            self.assertEqual(self.service.get_routing_statistics(), stats)
+
+        # Saving a referral invalidates, as does bulk routing without signals
+        Referral.objects.create(
+            referrer=self.gp_user,
+            patient=self.patient_user,
+            presenting_problem="New problem",
+        )
+        stats = self.service.get_routing_statistics()
+        self.assertEqual(stats["total_referrals"], 2)
+        self.assertEqual(stats["auto_routed"], 0)
+
+        self.service.route_referrals_bulk([(self.referral, {"decision": "auto"})])
+        self.assertEqual(self.service.get_routing_statistics()["auto_routed"], 1)
+
     def test_get_high_touch_queue(self):
         """Test getting high-touch queue."""
         # Create referrals in different statuses
@@ -541,28 +1214,67 @@ class TestReferralRoutingService(TestCase):
             status=Referral.Status.SUBMITTED,
         )
 
-        queue = self.service.get_high_touch_queue()
+        # The queue comes back as an already-evaluated list, users joined in
+        with self.assertNumQueries(1):
+            queue = self.service.get_high_touch_queue()
+            names = [
+                (referral.patient.get_full_name(), referral.referrer.get_full_name())
+                for referral in queue
+            ]
 
-        self.assertEqual(queue.count(), 1)
-        self.assertEqual(queue.first().presenting_problem, "Problem 1")
+        self.assertEqual(len(queue), 1)
+        self.assertEqual(queue[0].presenting_problem, "Problem 1")
+        self.assertEqual(len(names), 1)
 
     def test_create_default_thresholds(self):
         """Test creating default thresholds."""
-        from matching.models import MatchingThreshold
-
         # Clear existing thresholds
         MatchingThreshold.objects.all().delete()
 
-        result = self.service.create_default_thresholds()
+        with self.assertNumQueries(1):
+            result = self.service.create_default_thresholds()
 
         self.assertTrue(result)
         self.assertEqual(MatchingThreshold.objects.count(), 4)
 
+        # Running again leaves the existing rows alone
+        self.assertTrue(self.service.create_default_thresholds())
+        self.assertEqual(MatchingThreshold.objects.count(), 4)
+
         # Check specific thresholds
         gp_threshold = MatchingThreshold.objects.get(user_type="gp")
         self.assertEqual(gp_threshold.auto_threshold, 0.7)
         self.assertEqual(gp_threshold.high_touch_threshold, 0.5)
 
+    def test_get_active_thresholds_cached(self):
+        """Test active thresholds are cached until a threshold changes."""
+        self.service.create_default_thresholds()
+
+        with self.assertNumQueries(1):
+            thresholds = self.service.get_active_thresholds()
+        with self.assertNumQueries(0):
+            self.assertEqual(self.service.get_active_thresholds(), thresholds)
+        self.assertEqual(len(thresholds), len(MatchingThreshold.UserType.values))
+
+        # Saving a threshold invalidates the cached list
+        threshold = thresholds[0]
+        threshold.is_active = False
+        threshold.save(update_fields=["is_active"])
+
+        self.assertNotIn(threshold, self.service.get_active_thresholds())
+
+    def test_clear_all_caches_keeps_other_entries(self):
+        """Test clearing matching caches leaves unrelated cache entries alone."""
+        cache.set("threshold_config_gp", "test_value", 3600)
+        cache.set("routing_statistics", {"total_referrals": 1}, 3600)
+        cache.set("unrelated_key", "keep me", 3600)
+
+        self.service.clear_all_caches()
+
+        self.assertIsNone(cache.get("threshold_config_gp"))
+        self.assertIsNone(cache.get("routing_statistics"))
+        self.assertEqual(cache.get("unrelated_key"), "keep me")
+
     def test_invalidate_threshold_cache(self):
         """Test cache invalidation."""
         # Set some cache values
@@ -582,7 +1294,11 @@ class TestReferralRoutingService(TestCase):
         # Set patient cache again for the final test
         cache.set("threshold_config_patient", "test_value", 3600)
 
-        # Invalidate all
-        self.service.invalidate_threshold_cache()
+        # Invalidate all, in one cache call rather than one per user type
+        with patch.object(
+            cache, "delete_many", wraps=cache.delete_many
+        ) as mock_delete_many:
+            self.service.invalidate_threshold_cache()
 
+        mock_delete_many.assert_called_once()
         self.assertIsNone(cache.get("threshold_config_patient"))
@@ -2,50 +2,61 @@
 Tests for matching views.
 """
 import json
+from unittest.mock import patch
 
 from django.contrib.auth import get_user_model
 from django.core.cache import cache
+from django.db import connection
 from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
 from catalogue.models import Psychologist
 from matching.models import MatchingThreshold
+from matching.services import MatchingService
 from referrals.models import Referral
 
 User = get_user_model()
 
+# Resolve each endpoint once at import rather than in every test
+DASHBOARD_URL = reverse("matching:dashboard")
+FIND_MATCHES_URL = reverse("matching:find_matches")
+ROUTING_STATISTICS_URL = reverse("matching:routing_statistics")
+HIGH_TOUCH_QUEUE_URL = reverse("matching:high_touch_queue")
+CLEAR_CACHE_URL = reverse("matching:clear_cache")
+THRESHOLD_CONFIG_URL = reverse("matching:threshold_config")
+UPDATE_THRESHOLD_URL = reverse("matching:update_threshold")
+PERFORMANCE_METRICS_API_URL = reverse("matching:performance_metrics_api")
+
 
 class TestMatchingViews(TestCase):
     """Test matching views."""
 
-    def setUp(self):
-        self.client = Client()
-        cache.clear()
-
-        # Create test users
-        self.gp_user = User.objects.create_user(
+    @classmethod
+    def setUpTestData(cls):
+        # Create test users; only the GP logs in with a password, so the
+        # others get unusable ones and skip hashing
+        cls.gp_user = User.objects.create_user(
             username="gp_user",
             email="gp@example.com",
             user_type="gp",
             password="testpass123",
         )
-        self.patient_user = User.objects.create_user(
+        cls.patient_user = User.objects.create_user(
             username="patient_user",
             email="patient@example.com",
             user_type="patient",
-            password="testpass123",
         )
-        self.psychologist_user = User.objects.create_user(
+        cls.psychologist_user = User.objects.create_user(
             username="psych_user",
             email="psych@example.com",
             user_type="psychologist",
-            password="testpass123",
         )
 
         # Create test referral
-        self.referral = Referral.objects.create(
-            referrer=self.gp_user,
-            patient=self.patient_user,
+        cls.referral = Referral.objects.create(
+            referrer=cls.gp_user,
+            patient=cls.patient_user,
             presenting_problem="Anxiety and depression",
             service_type=Referral.ServiceType.NHS,
             modality=Referral.Modality.REMOTE,
@@ -53,8 +64,8 @@ class TestMatchingViews(TestCase):
         )
 
         # Create test psychologist
-        self.psychologist = Psychologist.objects.create(
-            user=self.psychologist_user,
+        cls.psychologist = Psychologist.objects.create(
+            user=cls.psychologist_user,
             specialisms=["anxiety", "depression"],
             service_type="nhs",
             modality="remote",
@@ -67,25 +78,57 @@ class TestMatchingViews(TestCase):
             user_type="gp", auto_threshold=0.7, high_touch_threshold=0.5
         )
 
-    def tearDown(self):
+    def setUp(self):
+        self.client = Client()
         cache.clear()
 
     def test_matching_dashboard_requires_login(self):
         """Test that matching dashboard requires login."""
-        response = self.client.get(reverse("matching:dashboard"))
+        response = self.client.get(DASHBOARD_URL)
         self.assertEqual(response.status_code, 302)  # Redirect to login
 
     def test_matching_dashboard_authenticated(self):
-        """Test matching dashboard for authenticated user."""
-        self.client.login(username="gp_user", password="testpass123")
-        response = self.client.get(reverse("matching:dashboard"))
+        """Test matching dashboard for a user logged in with their password."""
+        # The one real login; every other test skips authentication
+        self.assertTrue(self.client.login(username="gp_user", password="testpass123"))
+        response = self.client.get(DASHBOARD_URL)
         self.assertEqual(response.status_code, 200)
         self.assertContains(response, "Matching Dashboard")
 
+    def test_matching_dashboard_queue_queries_constant(self):
+        """Test queue rows don't add a patient or referrer query each."""
+        self.client.force_login(self.gp_user)
+
+        with CaptureQueriesContext(connection) as baseline:
+            self.client.get(DASHBOARD_URL)
+
+        for status in (
+            Referral.Status.HIGH_TOUCH_QUEUE,
+            Referral.Status.SHORTLISTED,
+            Referral.Status.MATCHING,
+        ):
+            for _ in range(3):
+                Referral.objects.create(
+                    referrer=self.gp_user,
+                    patient=self.patient_user,
+                    presenting_problem="Queued problem",
+                    status=status,
+                )
+
+        with self.assertNumQueries(len(baseline.captured_queries)):
+            response = self.client.get(DASHBOARD_URL)
+
+        self.assertContains(response, "Queued problem", count=9)
+
+        # Only the rendered columns are loaded; the rest stay deferred
+        queued = response.context["high_touch_referrals"][0]
+        self.assertIn("routing_metadata", queued.get_deferred_fields())
+        self.assertIn("password", queued.patient.get_deferred_fields())
+
     def test_find_matches_api_requires_login(self):
         """Test that find matches API requires login."""
         response = self.client.post(
-            reverse("matching:find_matches"),
+            FIND_MATCHES_URL,
             {"referral_id": str(self.referral.id)},
             content_type="application/json",
         )
@@ -93,10 +136,10 @@ class TestMatchingViews(TestCase):
 
     def test_find_matches_api_authenticated(self):
         """Test find matches API for authenticated user."""
-        self.client.login(username="gp_user", password="testpass123")
+        self.client.force_login(self.gp_user)
 
         response = self.client.post(
-            reverse("matching:find_matches"),
+            FIND_MATCHES_URL,
             {"referral_id": str(self.referral.id)},
             content_type="application/json",
         )
@@ -106,12 +149,45 @@ class TestMatchingViews(TestCase):
         self.assertIn("matches", data)
         self.assertIn("routing_decision", data)
 
+    def test_find_matches_api_reuses_result_until_referral_changes(self):
+        """Test repeated calls for an unchanged referral skip re-matching."""
+        self.client.force_login(self.gp_user)
+
+        with patch(
+            "matching.views.MatchingService.find_matches",
+            autospec=True,
+            side_effect=MatchingService.find_matches,
+        ) as mock_find_matches:
+            responses = [
+                self.client.post(
+                    FIND_MATCHES_URL,
+                    {"referral_id": str(self.referral.id)},
+                    content_type="application/json",
+                )
+                for _ in range(2)
+            ]
+            self.assertEqual(mock_find_matches.call_count, 1)
+            self.assertEqual(
+                json.loads(responses[0].content), json.loads(responses[1].content)
+            )
+
+            # Saving the referral moves it to a new cache version
+            referral = Referral.objects.get(pk=self.referral.pk)
+            referral.save()
+            self.client.post(
+                FIND_MATCHES_URL,
+                {"referral_id": str(self.referral.id)},
+                content_type="application/json",
+            )
+
+        self.assertEqual(mock_find_matches.call_count, 2)
+
     def test_find_matches_api_invalid_referral(self):
         """Test find matches API with invalid referral ID."""
-        self.client.login(username="gp_user", password="testpass123")
+        self.client.force_login(self.gp_user)
 
         response = self.client.post(
-            reverse("matching:find_matches"),
+            FIND_MATCHES_URL,
             {"referral_id": "invalid-id"},
             content_type="application/json",
         )
@@ -122,10 +198,10 @@ class TestMatchingViews(TestCase):
 
     def test_find_matches_api_missing_referral_id(self):
         """Test find matches API with missing referral ID."""
-        self.client.login(username="gp_user", password="testpass123")
+        self.client.force_login(self.gp_user)
 
         response = self.client.post(
-            reverse("matching:find_matches"), {}, content_type="application/json"
+            FIND_MATCHES_URL, {}, content_type="application/json"
         )
 
         self.assertEqual(response.status_code, 400)
@@ -134,14 +210,14 @@ class TestMatchingViews(TestCase):
 
     def test_routing_statistics_api_requires_login(self):
         """Test that routing statistics API requires login."""
-        response = self.client.get(reverse("matching:routing_statistics"))
+        response = self.client.get(ROUTING_STATISTICS_URL)
         self.assertEqual(response.status_code, 403)
 
     def test_routing_statistics_api_authenticated(self):
         """Test routing statistics API for authenticated user."""
-        self.client.login(username="gp_user", password="testpass123")
+        self.client.force_login(self.gp_user)
 
-        response = self.client.get(reverse("matching:routing_statistics"))
+        response = self.client.get(ROUTING_STATISTICS_URL)
 
         self.assertEqual(response.status_code, 200)
         data = json.loads(response.content)
@@ -152,12 +228,12 @@ class TestMatchingViews(TestCase):
 
     def test_high_touch_queue_api_requires_login(self):
         """Test that high-touch queue API requires login."""
-        response = self.client.get(reverse("matching:high_touch_queue"))
+        response = self.client.get(HIGH_TOUCH_QUEUE_URL)
         self.assertEqual(response.status_code, 403)
 
     def test_high_touch_queue_api_authenticated(self):
         """Test high-touch queue API for authenticated user."""
-        self.client.login(username="gp_user", password="testpass123")
+        self.client.force_login(self.gp_user)
 
         # Create a referral in high-touch queue
         high_touch_referral = Referral.objects.create(
@@ -167,7 +243,7 @@ class TestMatchingViews(TestCase):
             status=Referral.Status.HIGH_TOUCH_QUEUE,
         )
 
-        response = self.client.get(reverse("matching:high_touch_queue"))
+        response = self.client.get(HIGH_TOUCH_QUEUE_URL)
 
         self.assertEqual(response.status_code, 200)
         data = json.loads(response.content)
@@ -175,20 +251,80 @@ class TestMatchingViews(TestCase):
         self.assertEqual(len(data["referrals"]), 1)
         self.assertEqual(data["referrals"][0]["id"], str(high_touch_referral.id))
 
+    def test_high_touch_queue_api_queries_constant(self):
+        """Test the queue API's query count doesn't grow with its length."""
+        self.client.force_login(self.gp_user)
+
+        referral_fields = {
+            "referrer": self.gp_user,
+            "patient": self.patient_user,
+            "presenting_problem": "High-touch case",
+            "status": Referral.Status.HIGH_TOUCH_QUEUE,
+        }
+
+        Referral.objects.create(**referral_fields)
+        with CaptureQueriesContext(connection) as baseline:
+            self.client.get(HIGH_TOUCH_QUEUE_URL)
+
+        for _ in range(19):
+            Referral.objects.create(**referral_fields)
+
+        with self.assertNumQueries(len(baseline.captured_queries)):
+            response = self.client.get(HIGH_TOUCH_QUEUE_URL)
+
+        self.assertEqual(len(json.loads(response.content)["referrals"]), 20)
+
+    @patch("matching.views._HIGH_TOUCH_PAGE_SIZE", 2)
+    def test_high_touch_queue_api_paginated(self):
+        """Test the queue API pages through referrals oldest first."""
+        self.client.force_login(self.gp_user)
+        referrals = [
+            Referral.objects.create(
+                referrer=self.gp_user,
+                patient=self.patient_user,
+                presenting_problem=f"High-touch case {i}",
+                status=Referral.Status.HIGH_TOUCH_QUEUE,
+            )
+            for i in range(3)
+        ]
+
+        cases = [
+            (1, referrals[:2], True),
+            (2, referrals[2:], False),
+            (3, [], False),
+        ]
+        for page, expected, has_next in cases:
+            with self.subTest(page=page):
+                response = self.client.get(HIGH_TOUCH_QUEUE_URL, {"page": page})
+
+                self.assertEqual(response.status_code, 200)
+                data = json.loads(response.content)
+                self.assertEqual(
+                    [referral["id"] for referral in data["referrals"]],
+                    [str(referral.id) for referral in expected],
+                )
+                self.assertEqual(data["page"], page)
+                self.assertEqual(data["has_next"], has_next)
+
+        for page in ("0", "first"):
+            with self.subTest(page=page):
+                response = self.client.get(HIGH_TOUCH_QUEUE_URL, {"page": page})
+                self.assertEqual(response.status_code, 400)
+
     def test_clear_cache_api_requires_login(self):
         """Test that clear cache API requires login."""
-        response = self.client.post(reverse("matching:clear_cache"))
+        response = self.client.post(CLEAR_CACHE_URL)
         self.assertEqual(response.status_code, 403)
 
     def test_clear_cache_api_authenticated(self):
         """Test clear cache API for authenticated user."""
-        self.client.login(username="gp_user", password="testpass123")
+        self.client.force_login(self.gp_user)
 
         # Set some cache values
         cache.set("test_key", "test_value", 3600)
         self.assertIsNotNone(cache.get("test_key"))
 
-        response = self.client.post(reverse("matching:clear_cache"))
+        response = self.client.post(CLEAR_CACHE_URL)
 
         self.assertEqual(response.status_code, 200)
         data = json.loads(response.content)
@@ -198,14 +334,14 @@ class TestMatchingViews(TestCase):
 
     def test_threshold_config_api_requires_login(self):
         """Test that threshold config API requires login."""
-        response = self.client.get(reverse("matching:threshold_config"))
+        response = self.client.get(THRESHOLD_CONFIG_URL)
         self.assertEqual(response.status_code, 403)
 
     def test_threshold_config_api_authenticated(self):
         """Test threshold config API for authenticated user."""
-        self.client.login(username="gp_user", password="testpass123")
+        self.client.force_login(self.gp_user)
 
-        response = self.client.get(reverse("matching:threshold_config"))
+        response = self.client.get(THRESHOLD_CONFIG_URL)
 
         self.assertEqual(response.status_code, 200)
         data = json.loads(response.content)
@@ -216,7 +352,7 @@ class TestMatchingViews(TestCase):
     def test_update_threshold_api_requires_login(self):
         """Test that update threshold API requires login."""
         response = self.client.post(
-            reverse("matching:update_threshold"),
+            UPDATE_THRESHOLD_URL,
             {"user_type": "gp", "auto_threshold": 0.8, "high_touch_threshold": 0.6},
             content_type="application/json",
         )
@@ -224,10 +360,10 @@ class TestMatchingViews(TestCase):
 
     def test_update_threshold_api_authenticated(self):
         """Test update threshold API for authenticated user."""
-        self.client.login(username="gp_user", password="testpass123")
+        self.client.force_login(self.gp_user)
 
         response = self.client.post(
-            reverse("matching:update_threshold"),
+            UPDATE_THRESHOLD_URL,
             {"user_type": "gp", "auto_threshold": 0.8, "high_touch_threshold": 0.6},
             content_type="application/json",
         )
@@ -245,10 +381,10 @@ class TestMatchingViews(TestCase):
 
     def test_update_threshold_api_invalid_data(self):
         """Test update threshold API with invalid data."""
-        self.client.login(username="gp_user", password="testpass123")
+        self.client.force_login(self.gp_user)
 
         response = self.client.post(
-            reverse("matching:update_threshold"),
+            UPDATE_THRESHOLD_URL,
             {
                 "user_type": "invalid",
                 "auto_threshold": 0.8,
@@ -261,16 +397,25 @@ class TestMatchingViews(TestCase):
         data = json.loads(response.content)
         self.assertIn("error", data)
 
+    def test_performance_metrics_page_and_api_urls_distinct(self):
+        """Test the dashboard's metrics link isn't shadowed by the API route."""
+        self.assertEqual(
+            reverse("matching:performance_metrics"), "/matching/performance/"
+        )
+        self.assertEqual(
+            PERFORMANCE_METRICS_API_URL, "/matching/api/performance-metrics/"
+        )
+
     def test_performance_metrics_api_requires_login(self):
         """Test that performance metrics API requires login."""
-        response = self.client.get(reverse("matching:performance_metrics"))
+        response = self.client.get(PERFORMANCE_METRICS_API_URL)
         self.assertEqual(response.status_code, 403)
 
     def test_performance_metrics_api_authenticated(self):
         """Test performance metrics API for authenticated user."""
-        self.client.login(username="gp_user", password="testpass123")
+        self.client.force_login(self.gp_user)
 
-        response = self.client.get(reverse("matching:performance_metrics"))
+        response = self.client.get(PERFORMANCE_METRICS_API_URL)
 
         self.assertEqual(response.status_code, 200)
         data = json.loads(response.content)
@@ -280,19 +425,19 @@ class TestMatchingViews(TestCase):
     def test_user_permissions(self):
         """Test that only authorized users can access matching features."""
         # Test with patient user (should have limited access)
-        self.client.login(username="patient_user", password="testpass123")
+        self.client.force_login(self.patient_user)
 
-        response = self.client.get(reverse("matching:dashboard"))
+        response = self.client.get(DASHBOARD_URL)
         self.assertEqual(response.status_code, 200)  # Should be able to view
 
-        response = self.client.post(reverse("matching:clear_cache"))
+        response = self.client.post(CLEAR_CACHE_URL)
         self.assertEqual(response.status_code, 403)  # Should not be able to clear cache
 
         # Test with psychologist user
-        self.client.login(username="psych_user", password="testpass123")
+        self.client.force_login(self.psychologist_user)
 
-        response = self.client.get(reverse("matching:dashboard"))
+        response = self.client.get(DASHBOARD_URL)
         self.assertEqual(response.status_code, 200)
 
-        response = self.client.post(reverse("matching:clear_cache"))
+        response = self.client.post(CLEAR_CACHE_URL)
         self.assertEqual(response.status_code, 200)  # Should be able to clear cache
@@ -36,6 +36,6 @@ urlpatterns = [
     path(
         "api/performance-metrics/",
         views.performance_metrics_api,
-        name="performance_metrics",
+        name="performance_metrics_api",
     ),
 ]
@@ -18,6 +18,30 @@ from .models import CalibrationModel, MatchingAlgorithm, MatchingRun, MatchingTh
 from .routing_service import ReferralRoutingService
 from .services import MatchingService
 
+# High-touch queue referrals returned per API page
+_HIGH_TOUCH_PAGE_SIZE = 50
+
+# Seconds to reuse match results while the UI polls an unchanged referral
+_MATCHES_CACHE_TIMEOUT = 30
+
+# Referral and user columns the dashboard queue rows render
+_QUEUE_REFERRAL_FIELDS = (
+    "id",
+    "referral_id",
+    "presenting_problem",
+    "priority",
+    "created_at",
+    "patient__first_name",
+    "patient__last_name",
+    "referrer__first_name",
+    "referrer__last_name",
+)
+
+
+def _matches_cache_key(referral: Referral) -> str:
+    """Key match results by referral and version, so any save invalidates them."""
+    return f"find_matches_{referral.id}_{referral.updated_at.timestamp()}"
+
 
 def api_auth_required(view_func):
     """
@@ -61,21 +85,24 @@ class MatchingDashboardView(LoginRequiredMixin, TemplateView):
         if service_type_filter:
             filter_q &= Q(service_type=service_type_filter)
 
-        # Get referrals by status
+        # Get referrals by status; the queues show patient and referrer names
+        queue_referrals = Referral.objects.select_related("patient", "referrer").only(
+            *_QUEUE_REFERRAL_FIELDS
+        )
         high_touch_referrals = (
-            Referral.objects.filter(status=Referral.Status.HIGH_TOUCH_QUEUE)
+            queue_referrals.filter(status=Referral.Status.HIGH_TOUCH_QUEUE)
             .filter(filter_q)
             .order_by("-created_at")[:20]
         )
 
         auto_routed_referrals = (
-            Referral.objects.filter(status=Referral.Status.SHORTLISTED)
+            queue_referrals.filter(status=Referral.Status.SHORTLISTED)
             .filter(filter_q)
             .order_by("-created_at")[:20]
         )
 
         manual_review_referrals = (
-            Referral.objects.filter(status=Referral.Status.MATCHING)
+            queue_referrals.filter(status=Referral.Status.MATCHING)
             .filter(filter_q)
             .order_by("-created_at")[:20]
         )
@@ -89,7 +116,9 @@ class MatchingDashboardView(LoginRequiredMixin, TemplateView):
                 "high_touch_referrals": high_touch_referrals,
                 "auto_routed_referrals": auto_routed_referrals,
                 "manual_review_referrals": manual_review_referrals,
-                "recent_runs": MatchingRun.objects.all().order_by("-created_at")[:10],
+                "recent_runs": MatchingRun.objects.select_related("referral").order_by(
+                    "-created_at"
+                )[:10],
                 "algorithms": MatchingAlgorithm.objects.filter(is_active=True),
                 "calibration_models": CalibrationModel.objects.filter(is_active=True),
             }
@@ -122,7 +151,7 @@ class CalibrationView(LoginRequiredMixin, TemplateView):
         context["calibration_models"] = CalibrationModel.objects.all().order_by(
             "-created_at"
         )
-        context["thresholds"] = MatchingThreshold.objects.filter(is_active=True)
+        context["thresholds"] = ReferralRoutingService().get_active_thresholds()
         return context
 
 
@@ -138,7 +167,10 @@ class MatchingResultsView(LoginRequiredMixin, TemplateView):
         referral_id = kwargs.get("referral_id")
 
         if referral_id:
-            referral = get_object_or_404(Referral, id=referral_id)
+            # Referrer is read by threshold routing, patient by the template
+            referral = get_object_or_404(
+                Referral.objects.select_related("referrer", "patient"), id=referral_id
+            )
 
             # Run matching
             start_time = time.time()
@@ -249,7 +281,7 @@ class PerformanceMetricsView(LoginRequiredMixin, TemplateView):
         }
 
         # Get threshold configurations
-        thresholds = MatchingThreshold.objects.filter(is_active=True)
+        thresholds = ReferralRoutingService().get_active_thresholds()
 
         context.update(
             {
@@ -277,7 +309,15 @@ def find_matches_api(request):
         if not referral_id:
             return JsonResponse({"error": "referral_id is required"}, status=400)
 
-        referral = get_object_or_404(Referral, id=referral_id)
+        # Referrer is read by threshold routing
+        referral = get_object_or_404(
+            Referral.objects.select_related("referrer"), id=referral_id
+        )
+
+        # Repeated polls for an unchanged referral reuse the last result
+        payload = cache.get(_matches_cache_key(referral))
+        if payload is not None:
+            return JsonResponse(payload)
 
         # Run matching
         start_time = time.time()
@@ -297,14 +337,17 @@ def find_matches_api(request):
                 }
             )
 
-        return JsonResponse(
-            {
-                "matches": serializable_matches,
-                "routing_decision": routing_decision,
-                "processing_time": processing_time,
-                "total_matches": len(serializable_matches),
-            }
-        )
+        payload = {
+            "matches": serializable_matches,
+            "routing_decision": routing_decision,
+            "processing_time": processing_time,
+            "total_matches": len(serializable_matches),
+        }
+
+        # Routing saves the referral, so key the result by its new version
+        cache.set(_matches_cache_key(referral), payload, _MATCHES_CACHE_TIMEOUT)
+
+        return JsonResponse(payload)
 
     except json.JSONDecodeError:
         return JsonResponse({"error": "Invalid JSON"}, status=400)
@@ -330,11 +373,23 @@ def routing_statistics_api(request):
 @api_auth_required
 def high_touch_queue_api(request):
     """
-    API endpoint to get high-touch queue referrals.
+    API endpoint to get high-touch queue referrals, a page at a time.
     """
+    try:
+        page = int(request.GET.get("page", 1))
+    except ValueError:
+        return JsonResponse({"error": "page must be an integer"}, status=400)
+    if page < 1:
+        return JsonResponse({"error": "page must be at least 1"}, status=400)
+
     try:
         routing_service = ReferralRoutingService()
-        referrals = routing_service.get_high_touch_queue(limit=50)
+        # Fetch one extra row to tell whether another page follows
+        referrals = routing_service.get_high_touch_queue(
+            limit=_HIGH_TOUCH_PAGE_SIZE + 1, offset=(page - 1) * _HIGH_TOUCH_PAGE_SIZE
+        )
+        has_next = len(referrals) > _HIGH_TOUCH_PAGE_SIZE
+        referrals = referrals[:_HIGH_TOUCH_PAGE_SIZE]
 
         serializable_referrals = []
         for referral in referrals:
@@ -350,7 +405,9 @@ def high_touch_queue_api(request):
                 }
             )
 
-        return JsonResponse({"referrals": serializable_referrals})
+        return JsonResponse(
+            {"referrals": serializable_referrals, "page": page, "has_next": has_next}
+        )
     except Exception as e:
         return JsonResponse({"error": str(e)}, status=500)
 
@@ -385,7 +442,8 @@ def threshold_config_api(request):
     API endpoint to get threshold configurations.
     """
     try:
-        thresholds = MatchingThreshold.objects.filter(is_active=True)
+        routing_service = ReferralRoutingService()
+        thresholds = routing_service.get_active_thresholds()
         serializable_thresholds = []
         for threshold in thresholds:
             serializable_thresholds.append(
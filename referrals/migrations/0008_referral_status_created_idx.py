@@ -0,0 +1,22 @@
+# Generated by Django 4.2.7 on 2026-10-17 10:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("referrals", "0007_alter_referral_patient_patientprofile_and_more"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="referral",
+            name="referrals_r_status_50a3e5_idx",
+        ),
+        migrations.AddIndex(
+            model_name="referral",
+            index=models.Index(
+                fields=["status", "created_at"], name="referral_status_created_idx"
+            ),
+        ),
+    ]
@@ -273,7 +273,10 @@ class Referral(models.Model):
         verbose_name_plural = "Referrals"
         indexes = [
             models.Index(fields=["referral_id"]),
-            models.Index(fields=["status"]),
+            # Serves status lookups and the status queues ordered by age
+            models.Index(
+                fields=["status", "created_at"], name="referral_status_created_idx"
+            ),
             models.Index(fields=["priority"]),
             models.Index(fields=["service_type"]),
             models.Index(fields=["created_at"]),
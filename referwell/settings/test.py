@@ -0,0 +1,41 @@
+"""
+Test settings for ReferWell Direct project.
+"""
+from .development import *
+
+# Test passwords protect nothing, so hash them with the cheapest hasher
+PASSWORD_HASHERS = [
+    "django.contrib.auth.hashers.MD5PasswordHasher",
+]
+
+# The models need PostGIS, so SQLite is not an option; instead stop each
+# test-database commit waiting on a WAL flush, as a crash only loses test data
+DATABASES["default"]["OPTIONS"]["options"] = "-c synchronous_commit=off"
+
+# Keep the debug machinery off so tests run as production code would
+DEBUG = False
+
+# The development dummy cache stores nothing, so cached paths go untested;
+# an in-memory cache needs no Redis server and lives in each process, so
+# xdist workers never share entries or clear each other's
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    }
+}
+
+# Drop the development console and file handlers; loggers stay enabled so
+# tests can still assert on log records
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "null": {
+            "class": "logging.NullHandler",
+        },
+    },
+    "root": {
+        "handlers": ["null"],
+        "level": "WARNING",
+    },
+}